@@ -0,0 +1,159 @@
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+
+# Run from anywhere, the compiler lives one folder up
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from ply import lex
+from compiler import Compiler, dialect_modules
+from parserTables import buildParser
+from functionDirectory import FunctionDirectory
+from quadManager import QuadManager
+from objFile import writeBinaryObj
+from generate import generateProgram
+
+# Sizes (number of functions) measured when none are given
+DEFAULT_SIZES = [50, 100, 200, 400, 800]
+
+# Quads whose jump gets completed once its target is known
+jump_ops = ['GoTo', 'GoToF']
+
+## PHASE TIMING
+# Times spent inside the methods of some classes, e.g. the quad manager while parsing
+# NOTE: Only the outermost call is timed, so methods calling each other (or other timed classes) aren't
+# counted twice. Whatever time the parser spends outside of every timed method is the parsing itself
+class PhaseTimer:
+  def __init__(self, phases):
+    self.phases = phases      # Class -> name of its phase
+    self.times = {name: 0 for name in phases.values()}
+    self.depth = 0
+    self.originals = []
+
+  # Wrap a method so its calls count towards a phase
+  def wrap(self, method, phase):
+    def timed(*args, **kwargs):
+      if self.depth:
+        return method(*args, **kwargs)
+
+      self.depth += 1
+      start = time.perf_counter()
+      try:
+        return method(*args, **kwargs)
+      finally:
+        self.times[phase] += time.perf_counter() - start
+        self.depth -= 1
+    return timed
+
+  def __enter__(self):
+    for cls, phase in self.phases.items():
+      for name, method in list(vars(cls).items()):
+        if callable(method) and not name.startswith('__'):
+          self.originals.append((cls, name, method))
+          setattr(cls, name, self.wrap(method, phase))
+    return self
+
+  def __exit__(self, *exc):
+    for cls, name, method in self.originals:
+      setattr(cls, name, method)
+    self.originals = []
+
+## MEASURING
+# Measure every phase of compiling a source
+def measure(source, dialect):
+  lexerName, parserName = dialect_modules[dialect]
+  lexerModule, parserModule = __import__(lexerName), __import__(parserName)
+  result = {'lines': source.count('\n')}
+
+  start = time.perf_counter()
+  lex.lex(module=lexerModule)
+  result['lex_build'] = time.perf_counter() - start
+
+  start = time.perf_counter()
+  buildParser(parserModule)
+  result['tables'] = time.perf_counter() - start
+
+  compiler = Compiler(dialect)
+  start = time.perf_counter()
+  result['tokens'] = len(compiler.getTokens(source))
+  result['tokenize'] = time.perf_counter() - start
+
+  # Lexing, parsing and code generation happen together, so their split comes from a second, instrumented run
+  # (and the tokenizing above). NOTE: Instrumenting slows things down, so the split gets scaled back to the plain run
+  start = time.perf_counter()
+  quads = compiler.parse(source)
+  frontend = time.perf_counter() - start
+
+  with PhaseTimer({QuadManager: 'codegen', FunctionDirectory: 'symbols'}) as timer:
+    start = time.perf_counter()
+    compiler.parse(source)
+    instrumented = time.perf_counter() - start
+
+  scale = frontend / instrumented
+  result['codegen'] = timer.times['codegen'] * scale
+  result['symbols'] = timer.times['symbols'] * scale
+  result['parse'] = frontend - result['codegen'] - result['symbols'] - result['tokenize']
+  result['frontend'] = frontend
+  result['quads'] = quads.getQuadCount()
+  result['jumps'] = sum(1 for quad in quads.quads if quad[0] in jump_ops)
+
+  with tempfile.TemporaryDirectory() as folder:
+    start = time.perf_counter()
+    quads.build(os.path.join(folder, 'program.txt.o'))
+    result['build_text'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    writeBinaryObj(quads.getProgram(), os.path.join(folder, 'program.o'))
+    result['build_binary'] = time.perf_counter() - start
+
+  return result
+
+# Get how a phase grows between two sizes, as the exponent k of time ~ lines^k (1 is linear)
+def growth(small, big, phase):
+  if small[phase] <= 0 or big[phase] <= 0:
+    return None
+  return math.log(big[phase] / small[phase]) / math.log(big['lines'] / small['lines'])
+
+## REPORTING
+phases = ['tokenize', 'parse', 'codegen', 'symbols', 'build_text', 'build_binary']
+
+# Print one row per program, with how each phase grew since the previous size
+def printTable(results):
+  print(f'{"dialect":<9} {"funcs":>6} {"lines":>8} {"quads":>8} {"jumps":>7} ' + ' '.join(f'{phase:>13}' for phase in phases))
+  for dialect, rows in results.items():
+    previous = None
+    for row in rows:
+      cells = []
+      for phase in phases:
+        k = growth(previous, row, phase) if previous else None
+        cells.append(f'{row[phase] * 1e3:8.1f}' + (f' ^{k:.2f}' if k is not None else ' ' * 6)[:6].rjust(5))
+      print(f'{dialect:<9} {row["functions"]:>6} {row["lines"]:>8} {row["quads"]:>8} {row["jumps"]:>7} ' + ' '.join(f'{cell:>13}' for cell in cells))
+      previous = row
+  print('\nTimes in ms, ^k is how the phase grew since the row above (time ~ lines^k, 1 is linear)')
+
+if __name__ == '__main__':
+  cli = argparse.ArgumentParser(description='Measure how compile time grows with program size, phase by phase')
+  cli.add_argument('sizes', nargs='*', type=int, help=f'Numbers of functions to generate programs with (default: {DEFAULT_SIZES})')
+  cli.add_argument('-d', '--depth', type=int, default=3, help='How deep if/while/from blocks nest')
+  cli.add_argument('-e', '--expr', type=int, default=8, help='Operands in each expression')
+  cli.add_argument('-s', '--statements', type=int, default=4, help='Statements in each block')
+  cli.add_argument('--dialect', choices=list(dialect_modules), action='append', help='Only measure some dialects')
+  cli.add_argument('-o', '--output', help='Write the JSON report to a file')
+  args = cli.parse_args()
+
+  results = {dialect: [] for dialect in (args.dialect or dialect_modules)}
+  for functions in args.sizes or DEFAULT_SIZES:
+    sources = dict(zip(('standard', 'goose'), generateProgram(functions, args.depth, args.expr, args.statements)))
+    for dialect in results:
+      results[dialect].append({'functions': functions, **measure(sources[dialect], dialect)})
+
+  printTable(results)
+
+  if args.output:
+    with open(args.output, 'w') as f:
+      json.dump({'depth': args.depth, 'expr': args.expr, 'statements': args.statements, 'results': results}, f, indent=2)
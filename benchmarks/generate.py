@@ -0,0 +1,280 @@
+import argparse
+import os
+import random
+
+# Generates big, syntactically valid Honk programs to throw at the compiler, in both syntaxes
+# NOTE: Programs are built as a small tree of statements and expressions first, then written out by
+# each dialect's writer, so both versions of a program always compile to the same quads
+
+# Locals every generated function works with, besides its loop counters
+local_vars = ['a', 'b', 'c']
+
+# Operators used in arithmetic and in conditions
+# NOTE: Products only ever multiply two operands, so values stay far from overflowing
+arith_ops = ['+', '-', '*']
+compare_ops = ['<', '>', '<=', '>=', '==', '!=']
+logic_ops = ['&', '|']
+
+## TREE
+# Builds the statements and expressions of a program, all decided by a seeded random generator
+class ProgramTree:
+  def __init__(self, functions, depth, exprSize, statements, seed=0):
+    self.random = random.Random(seed)
+    self.depth = depth
+    self.exprSize = exprSize
+    self.statements = statements
+    self.leaves = max(1, functions // 10)
+    self.functions = [self.makeFunction(i) for i in range(functions)]
+    self.main = self.makeMain()
+
+  # Get an expression with about `size` operands
+  # NOTE: Calls only go to the leading tenth of functions, which call nothing themselves, with a single
+  # argument that holds no other call. No recursion and no nested calls keeps programs quick to run
+  # (besides the chain of calls in makeFunction)
+  def makeExpr(self, size, func, callable=True):
+    if size <= 1:
+      roll = self.random.random()
+      if callable and func >= self.leaves and roll < 0.1:
+        return ('call', f'f{self.random.randrange(self.leaves)}', self.makeExpr(2, func, False))
+      elif roll < 0.5:
+        return ('num', self.random.randrange(1, 100))
+      return ('var', self.random.choice(local_vars + ['x']))
+
+    left = self.random.randint(1, size - 1)
+    op = self.random.choice(arith_ops if size == 2 else arith_ops[:2])
+    expr = ('bin', op, self.makeExpr(left, func, callable), self.makeExpr(size - left, func, callable))
+
+    # Operations between two numbers get folded into new constants, which would soon run out of room
+    if expr[2][0] == 'num' and expr[3][0] == 'num':
+      expr = expr[:3] + (('var', self.random.choice(local_vars + ['x'])),)
+    return expr
+
+  # Get a condition, comparing two expressions (or two pairs of them)
+  def makeCondition(self, func):
+    size = max(2, self.exprSize // 2)
+    compare = lambda: ('bin', self.random.choice(compare_ops), self.makeExpr(size // 2 or 1, func), self.makeExpr(size // 2 or 1, func))
+    if self.random.random() < 0.3:
+      return ('bin', self.random.choice(logic_ops), compare(), compare())
+    return compare()
+
+  # Get a block of statements, nesting further blocks until running out of depth
+  def makeBlock(self, level, func):
+    block = []
+    for _ in range(self.statements):
+      roll = self.random.random() if level < self.depth else 1
+      if roll < 0.2:
+        block.append(('if', self.makeCondition(func), self.makeBlock(level + 1, func), self.makeBlock(level + 1, func) if roll < 0.1 else None))
+      elif roll < 0.35:
+        block.append(('while', level, self.makeCondition(func), self.makeBlock(level + 1, func)))
+      elif roll < 0.5:
+        block.append(('from', level, self.makeBlock(level + 1, func)))
+      else:
+        block.append(('assign', self.random.choice(local_vars), self.makeExpr(self.exprSize, func)))
+    return block
+
+  # Get a function, named after its position
+  # NOTE: Every function past the leading tenth starts off calling the one right before it, and one of the
+  # leading tenth, so a call to the last function reaches every other one. Otherwise most of them would be
+  # dead code, and compiling wouldn't grow along with the number of functions
+  def makeFunction(self, func):
+    body = self.makeBlock(0, func)
+    if func >= self.leaves:
+      chain = ('bin', '+', ('call', f'f{func - 1}', ('var', 'x')), ('call', f'f{func % self.leaves}', ('var', 'x')))
+      body.insert(0, ('assign', 'a', chain))
+    return {'name': f'f{func}', 'body': body, 'return': self.makeExpr(self.exprSize, func)}
+
+  # Get main, calling a handful of functions (always including the last one) and printing what they return
+  def makeMain(self):
+    calls = set(self.random.sample(range(len(self.functions)), min(5, len(self.functions))))
+    calls.add(len(self.functions) - 1)
+    return [f'f{func}' for func in sorted(calls)]
+
+## WRITERS
+# Writes a program tree in the standard syntax
+class StandardWriter:
+  ops = {op: op for op in arith_ops + compare_ops + logic_ops + ['%']}
+
+  def program(self, name):
+    return f'Program {name};'
+
+  def globals(self):
+    return 'var\n  int r;\n'
+
+  def function(self, name, depth):
+    counters = ', '.join([f'i{d}' for d in range(depth + 1)] + [f'w{d}' for d in range(depth + 1)])
+    return f'function int {name}(int x)\nvar int {", ".join(local_vars)}, {counters};'
+
+  def open(self):
+    return '{'
+
+  def close(self):
+    return '}'
+
+  def main(self):
+    return 'main() {'
+
+  def assign(self, var, expr):
+    return f'{var} = {expr};'
+
+  def ret(self, expr):
+    return f'return({expr});'
+
+  def print(self, expr):
+    return f'print({expr});'
+
+  def ifStart(self, cond):
+    return f'if ({cond}) then {{'
+
+  def elseStart(self):
+    return '} else {'
+
+  def whileStart(self, cond):
+    return f'while ({cond}) do {{'
+
+  def fromStart(self, var, limit):
+    return f'from ({var} = 0 to {limit}) do {{'
+
+  def group(self, expr):
+    return f'({expr})'
+
+  def call(self, func, arg):
+    return f'{func}({arg})'
+
+# Writes a program tree in the goose syntax
+class GooseWriter:
+  ops = {
+    '+': 'MORE GOOSE', '-': 'LESS GOOSE', '*': 'GOOSETIPLY', '%': 'LEFTOVERS',
+    '<': 'INFERIOR', '>': 'SUPERIOR', '<=': 'INFERIOR maybe', '>=': 'SUPERIOR maybe', '==': 'AM GOOSE?', '!=': 'NOT GOOSE?!',
+    '&': 'TOGETHER FOREVER', '|': 'POLE'
+  }
+
+  def program(self, name):
+    return f'Untitled {name} game HONK'
+
+  def globals(self):
+    return 'pond\n  WHOLE GOOSE r HONK\n'
+
+  def function(self, name, depth):
+    counters = ' MOAR '.join([f'i{d}' for d in range(depth + 1)] + [f'w{d}' for d in range(depth + 1)])
+    return f'task WHOLE GOOSE {name} HONK WHOLE GOOSE x HONK\npond WHOLE GOOSE {" MOAR ".join(local_vars)} MOAR {counters} HONK'
+
+  def open(self):
+    return 'OPEN FANCY GATE'
+
+  def close(self):
+    return 'CLOSE FANCY GATE'
+
+  def main(self):
+    return 'Press y to honk\nOPEN FANCY GATE'
+
+  def assign(self, var, expr):
+    return f'{var} AM {expr} HONK'
+
+  def ret(self, expr):
+    return f'GOT BELL {expr} HONK'
+
+  def print(self, expr):
+    return f'SHOW ON TV {expr} HONK'
+
+  def ifStart(self, cond):
+    return f'HONK? {cond} HONK! OPEN FANCY GATE'
+
+  def elseStart(self):
+    return 'CLOSE FANCY GATE BONK OPEN FANCY GATE'
+
+  def whileStart(self, cond):
+    return f'HONK HONK {cond} HOONK OPEN FANCY GATE'
+
+  def fromStart(self, var, limit):
+    return f'inhales {var} AM 0 HOOOONK {limit} HOONK OPEN FANCY GATE'
+
+  def group(self, expr):
+    return f'OPEN GATE {expr} CLOSE GATE'
+
+  def call(self, func, arg):
+    return f'HOOONK {func} OPEN GATE {arg} CLOSE GATE'
+
+# Write an expression, grouping every operation so precedence never matters
+def writeExpr(writer, expr):
+  if expr[0] == 'num':
+    return str(expr[1])
+  elif expr[0] == 'var':
+    return expr[1]
+  elif expr[0] == 'call':
+    return writer.call(expr[1], writeExpr(writer, expr[2]))
+
+  left, right = (writeExpr(writer, e) if e[0] != 'bin' else writer.group(writeExpr(writer, e)) for e in expr[2:])
+  return f'{left} {writer.ops[expr[1]]} {right}'
+
+# Write a block of statements, one per line
+# NOTE: Assignments are kept small with a modulo, and loops only run a couple of times
+def writeBlock(writer, block, indent):
+  lines = []
+  pad = '  ' * indent
+  for statement in block:
+    kind = statement[0]
+    if kind == 'assign':
+      lines.append(pad + writer.assign(statement[1], f'{writer.group(writeExpr(writer, statement[2]))} {writer.ops["%"]} 1000'))
+    elif kind == 'if':
+      lines.append(pad + writer.ifStart(writeExpr(writer, statement[1])))
+      lines += writeBlock(writer, statement[2], indent + 1)
+      if statement[3] is not None:
+        lines.append(pad + writer.elseStart())
+        lines += writeBlock(writer, statement[3], indent + 1)
+      lines.append(pad + writer.close())
+    elif kind == 'while':
+      counter = f'w{statement[1]}'
+      cond = ('bin', '&', ('bin', '<', ('var', counter), ('num', 2)), statement[2])
+      lines.append(pad + writer.assign(counter, '0'))
+      lines.append(pad + writer.whileStart(writeExpr(writer, cond)))
+      lines.append(pad + '  ' + writer.assign(counter, writeExpr(writer, ('bin', '+', ('var', counter), ('num', 1)))))
+      lines += writeBlock(writer, statement[3], indent + 1)
+      lines.append(pad + writer.close())
+    elif kind == 'from':
+      lines.append(pad + writer.fromStart(f'i{statement[1]}', 1))
+      lines += writeBlock(writer, statement[2], indent + 1)
+      lines.append(pad + writer.close())
+  return lines
+
+# Write a whole program tree
+def writeProgram(writer, tree, name):
+  lines = [writer.program(name), writer.globals()]
+  for func in tree.functions:
+    lines.append(writer.function(func['name'], tree.depth))
+    lines.append(writer.open())
+    for var in local_vars:
+      lines.append('  ' + writer.assign(var, 'x'))
+    lines += writeBlock(writer, func['body'], 1)
+    lines.append('  ' + writer.ret(f'{writer.group(writeExpr(writer, func["return"]))} {writer.ops["%"]} 1000'))
+    lines.append(writer.close())
+    lines.append('')
+
+  lines.append(writer.main())
+  for func in tree.main:
+    lines.append('  ' + writer.assign('r', writer.call(func, '1')))
+    lines.append('  ' + writer.print('r'))
+  lines.append(writer.close())
+  return '\n'.join(lines) + '\n'
+
+# Generate a program in both syntaxes -> (standard, goose)
+def generateProgram(functions, depth=3, exprSize=8, statements=4, seed=0, name='generated'):
+  tree = ProgramTree(functions, depth, exprSize, statements, seed)
+  return writeProgram(StandardWriter(), tree, name), writeProgram(GooseWriter(), tree, name)
+
+if __name__ == '__main__':
+  cli = argparse.ArgumentParser(description='Generate big Honk programs, in both syntaxes')
+  cli.add_argument('output', help='Folder to write <name>.duck and <name>.honk into')
+  cli.add_argument('-f', '--functions', type=int, default=100, help='Number of functions (up to ~2900, each one keeps its return value in a global)')
+  cli.add_argument('-d', '--depth', type=int, default=3, help='How deep if/while/from blocks nest')
+  cli.add_argument('-e', '--expr', type=int, default=8, help='Operands in each expression')
+  cli.add_argument('-s', '--statements', type=int, default=4, help='Statements in each block')
+  cli.add_argument('--seed', type=int, default=0, help='Seed, the same one always gives the same program')
+  cli.add_argument('--name', default='generated', help='Name of the program (and its files)')
+  args = cli.parse_args()
+
+  standard, goose = generateProgram(args.functions, args.depth, args.expr, args.statements, args.seed, args.name)
+  os.makedirs(args.output, exist_ok=True)
+  with open(os.path.join(args.output, f'{args.name}.duck'), 'w') as f:
+    f.write(standard)
+  with open(os.path.join(args.output, f'{args.name}.honk'), 'w') as f:
+    f.write(goose)
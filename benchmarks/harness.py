@@ -0,0 +1,169 @@
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from hashlib import sha256
+
+# Run from anywhere, the compiler and VM live one folder up
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+# Extensions of the programs in the corpus
+source_extensions = ('.duck', '.honk')
+
+# Bump whenever what gets measured changes, so old reports aren't compared against new ones
+HARNESS_VERSION = 1
+
+## MEASURING
+# NOTE: Each program is measured in a process of its own, so peak memory belongs to that program alone
+
+# Get the min and median of a list of times
+def summarize(times):
+  return {'min': min(times), 'median': statistics.median(times)}
+
+# Measure a single program: compile, load (read its binary .o and set up the VM) and execute, each on its own
+def measure(filename, repeat):
+  from compiler import Compiler, getDialect
+  from objFile import readObj, writeBinaryObj
+  from honkVM import HonkVM
+
+  with open(filename) as f:
+    source = f.read()
+
+  start = time.perf_counter()
+  compiler = Compiler(getDialect(filename))
+  startup = time.perf_counter() - start
+
+  compileTimes, loadTimes, executeTimes = [], [], []
+  with tempfile.TemporaryDirectory() as folder:
+    objFilename = os.path.join(folder, 'program.o')
+
+    for _ in range(repeat):
+      start = time.perf_counter()
+      program = compiler.compile(source)
+      compileTimes.append(time.perf_counter() - start)
+    writeBinaryObj(program, objFilename)
+
+    for _ in range(repeat):
+      start = time.perf_counter()
+      vm = HonkVM(readObj(objFilename))
+      loadTimes.append(time.perf_counter() - start)
+
+      out = io.StringIO()
+      with redirect_stdout(out):
+        start = time.perf_counter()
+        vm.execute()
+        executeTimes.append(time.perf_counter() - start)
+
+    # One more run under tracemalloc, kept out of the timings since it slows everything down
+    tracemalloc.start()
+    with redirect_stdout(io.StringIO()):
+      HonkVM(readObj(objFilename)).execute()
+    peakHeap = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+  return {
+    'dialect': getDialect(filename),
+    'quads': len(program['quads']),
+    'startup': startup,
+    'compile': summarize(compileTimes),
+    'load': summarize(loadTimes),
+    'execute': summarize(executeTimes),
+    'peak_heap_bytes': peakHeap,
+    'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'output_sha256': sha256(out.getvalue().encode()).hexdigest()
+  }
+
+# Measure a program in a fresh process
+def measureIsolated(filename, repeat):
+  result = subprocess.run(
+    [sys.executable, '-W', 'ignore', os.path.abspath(__file__), '--single', filename, '--repeat', str(repeat)],
+    capture_output=True, text=True
+  )
+  if result.returncode != 0:
+    return {'error': result.stderr.strip().split('\n')[-1]}
+  return json.loads(result.stdout)
+
+## REPORTING
+# Get the commit being measured, if there is one
+def getCommit():
+  try:
+    return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+  except (OSError, subprocess.CalledProcessError):
+    return None
+
+# Get every program in the corpus
+def collectPrograms(folder):
+  return sorted(os.path.join(folder, name) for name in os.listdir(folder) if name.endswith(source_extensions))
+
+# Print one row per program, compared against an older report when there is one
+def printTable(report, baseline=None):
+  print(f'{"program":<16} {"compile (ms)":>12} {"load (ms)":>10} {"execute (ms)":>13} {"heap (KB)":>10} {"rss (KB)":>9}  vs baseline')
+  for name, result in report['programs'].items():
+    if 'error' in result:
+      print(f'{name:<16} {result["error"]}')
+      continue
+
+    versus = ''
+    old = (baseline or {}).get('programs', {}).get(name)
+    if old and 'error' not in old:
+      versus = f'execute x{result["execute"]["median"] / old["execute"]["median"]:.2f}, compile x{result["compile"]["median"] / old["compile"]["median"]:.2f}'
+      if result['output_sha256'] != old['output_sha256']:
+        versus += ' (OUTPUT CHANGED)'
+
+    print(
+      f'{name:<16} {result["compile"]["median"] * 1e3:12.2f} {result["load"]["median"] * 1e3:10.2f} '
+      f'{result["execute"]["median"] * 1e3:13.2f} {result["peak_heap_bytes"] / 1024:10.0f} {result["peak_rss_kb"]:9}  {versus}'
+    )
+
+# Measure the whole corpus (or some programs of it)
+def run(programs, repeat):
+  report = {
+    'harness_version': HARNESS_VERSION,
+    'commit': getCommit(),
+    'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    'python': platform.python_version(),
+    'platform': platform.platform(),
+    'repeat': repeat,
+    'programs': dict()
+  }
+  for filename in programs:
+    report['programs'][os.path.basename(filename)] = measureIsolated(filename, repeat)
+  return report
+
+if __name__ == '__main__':
+  cli = argparse.ArgumentParser(description='Measure how long the Honk benchmark corpus takes to compile, load and execute')
+  cli.add_argument('programs', nargs='*', help='Programs to measure (defaults to the whole corpus)')
+  cli.add_argument('-o', '--output', help='Write the JSON report to a file')
+  cli.add_argument('-r', '--repeat', type=int, default=5, help='Times each phase gets measured (the median is reported)')
+  cli.add_argument('-c', '--compare', metavar='REPORT', help='Compare against an older JSON report')
+  cli.add_argument('--single', help=argparse.SUPPRESS)
+  args = cli.parse_args()
+
+  if args.single:
+    print(json.dumps(measure(args.single, args.repeat)))
+    sys.exit()
+
+  baseline = None
+  if args.compare:
+    with open(args.compare) as f:
+      baseline = json.load(f)
+    if baseline.get('harness_version') != HARNESS_VERSION:
+      print('Baseline was measured by a different harness version, ratios may not mean much', file=sys.stderr)
+
+  report = run(args.programs or collectPrograms(HERE), args.repeat)
+  printTable(report, baseline)
+
+  if args.output:
+    with open(args.output, 'w') as f:
+      json.dump(report, f, indent=2)
@@ -0,0 +1,125 @@
+import os
+import pickle
+import tempfile
+import time
+from hashlib import sha256
+
+# Bump to drop every cached program, e.g. when the layout of programs changes
+CACHE_VERSION = 1
+
+# Modules whose code decides what a source compiles into
+compiler_modules = [
+  'compiler.py', 'lexer.py', 'parser.py', 'lexhonker.py', 'parshonker.py', 'quadManager.py',
+  'functionDirectory.py', 'virtualDirectory.py', 'semanticCube.py', 'objFile.py', 'flowGraph.py',
+  'parserTables.py', 'ply/__init__.py', 'ply/lex.py', 'ply/yacc.py'
+]
+
+# Defaults, both can be overridden through the environment
+DEFAULT_FOLDER = os.path.join(os.path.expanduser('~'), '.cache', 'honk')
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+# Seconds before an unfinished entry is considered abandoned
+STALE_TMP_AGE = 3600
+
+# Get a fingerprint of the compiler's own code, so changing it never reuses stale programs
+def getCompilerVersion():
+  digest = sha256(str(CACHE_VERSION).encode())
+  here = os.path.dirname(os.path.abspath(__file__))
+  for module in compiler_modules:
+    with open(os.path.join(here, module), 'rb') as f:
+      digest.update(f.read())
+  return digest.hexdigest()
+
+# Cache of compiled programs, addressed by the hash of their source
+# NOTE: Entries are written to a temporary file and moved into place, and every read or eviction
+# tolerates entries vanishing in between, so any number of processes can share the same folder
+class CompileCache:
+  def __init__(self, folder=None, maxSize=None):
+    self.folder = folder or os.environ.get('HONK_CACHE_DIR') or DEFAULT_FOLDER
+    self.maxSize = maxSize if maxSize is not None else int(os.environ.get('HONK_CACHE_SIZE', DEFAULT_MAX_SIZE))
+    self.compilerVersion = None
+
+  ## GETTERS
+  # Get the key of a source, based on its text, the compiler's version and the dialect it's written in
+  def getKey(self, source, dialect):
+    if self.compilerVersion is None:
+      self.compilerVersion = getCompilerVersion()
+
+    digest = sha256()
+    digest.update(self.compilerVersion.encode())
+    digest.update(dialect.encode())
+    digest.update(b'\0')
+    digest.update(source.encode())
+    return digest.hexdigest()
+
+  # Get the path of an entry
+  def getPath(self, key):
+    return os.path.join(self.folder, f'{key}.hobj')
+
+  # Get a cached program, or None if it isn't cached
+  def get(self, key):
+    path = self.getPath(key)
+    try:
+      with open(path, 'rb') as f:
+        program = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+      return None
+
+    # Mark it as recently used
+    try:
+      os.utime(path)
+    except OSError:
+      pass
+    return program
+
+  ## SETTERS
+  # Cache a compiled program, evicting the least recently used ones if the cache gets too big
+  def put(self, key, program):
+    try:
+      os.makedirs(self.folder, exist_ok=True)
+      fd, tmp = tempfile.mkstemp(dir=self.folder, suffix='.tmp')
+      with os.fdopen(fd, 'wb') as f:
+        pickle.dump(program, f, pickle.HIGHEST_PROTOCOL)
+      os.replace(tmp, self.getPath(key))
+    except OSError:     # A program that can't be cached simply gets compiled again next time
+      return
+
+    self.evict()
+
+  # Remove the least recently used entries until the cache fits in its size
+  def evict(self):
+    entries = []
+    total = 0
+    try:
+      names = os.listdir(self.folder)
+    except OSError:
+      return
+
+    now = time.time()
+    for name in names:
+      try:
+        stat = os.stat(os.path.join(self.folder, name))
+      except OSError:   # Evicted by someone else
+        continue
+
+      # Leftovers of writers that died halfway through
+      if name.endswith('.tmp') and now - stat.st_mtime > STALE_TMP_AGE:
+        try:
+          os.remove(os.path.join(self.folder, name))
+        except OSError:
+          pass
+        continue
+      elif not name.endswith('.hobj'):
+        continue
+      entries.append((stat.st_mtime, stat.st_size, name))
+      total += stat.st_size
+
+    entries.sort()
+    for _, size, name in entries:
+      if total <= self.maxSize:
+        break
+      try:
+        os.remove(os.path.join(self.folder, name))
+      except OSError:
+        pass
+      total -= size
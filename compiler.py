@@ -0,0 +1,79 @@
+from ply import lex, yacc
+from parserTables import buildParser, ParseTables
+from functionDirectory import FunctionDirectory
+from quadManager import QuadManager
+from objFile import writeObj, writeBinaryObj
+
+# Lexer and parser modules of each dialect, imported only when first needed
+dialect_modules = {
+  'standard': ('lexer', 'parser'),
+  'goose': ('lexhonker', 'parshonker')
+}
+
+# Get the dialect a source file is written in, based on its extension
+def getDialect(filename):
+  return 'goose' if filename.endswith('.honk') else 'standard'
+
+# Lexer that lets a quad manager know which source line it's currently at
+# NOTE: Quads get tagged with the line of the last token read, which is the line the parser is working on
+class LineTracker:
+  def __init__(self, lexer, quads):
+    self.lexer = lexer
+    self.quads = quads
+
+  def token(self):
+    token = self.lexer.token()
+    if token:
+      self.quads.currentLine = token.lineno
+    return token
+
+# Compiles programs of one dialect, as many as needed
+# NOTE: Lexer rules and parse tables are built once and shared, while every compilation gets its own
+# lexer, parser, function directory and quad manager, so a single compiler can be used by many threads
+class Compiler:
+  def __init__(self, dialect='standard', debug=False):
+    if dialect not in dialect_modules:
+      raise Exception(f'Unknown dialect "{dialect}"!')
+
+    lexerName, parserName = dialect_modules[dialect]
+    self.dialect = dialect
+    self.debug = debug
+    self.lexer = lex.lex(module=__import__(lexerName))
+    self.parser = buildParser(__import__(parserName))
+
+  ## GETTERS
+  # Get a fresh lexer, fed with a source
+  def getLexer(self, source):
+    lexer = self.lexer.clone()
+    lexer.input(source)
+    return lexer
+
+  # Get the tokens of a source
+  def getTokens(self, source):
+    return list(self.getLexer(source))
+
+  ## COMPILING
+  # Parse a source with a fresh function directory and quad manager, getting the quad manager back
+  def parse(self, source):
+    funcDir = FunctionDirectory(self.debug)
+    quads = QuadManager(funcDir, self.debug)
+
+    # Parser sharing the tables, but not the parsing state, of every other compilation
+    parser = yacc.LRParser(ParseTables(self.parser.productions, self.parser.action, self.parser.goto), self.parser.errorfunc)
+    parser.funcDir = funcDir
+    parser.quads = quads
+
+    return parser.parse(lexer=LineTracker(self.getLexer(source), quads))
+
+  # Compile a source into a program (ranges, constants, ERAs and quads)
+  # NOTE: If given an output target, its .o file gets written too, as text if asked to
+  def compile(self, source, objFilename=None, textObj=False):
+    program = self.parse(source).getProgram()
+
+    if objFilename:
+      if textObj:
+        writeObj(program, objFilename)
+      else:
+        writeBinaryObj(program, objFilename)
+
+    return program
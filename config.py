@@ -1,3 +0,0 @@
-
-objFilename = ''
-debugParser = False
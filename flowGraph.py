@@ -0,0 +1,480 @@
+from virtualDirectory import VirtualDirectory, POINTER_BIT
+
+# Positions of the operands each operation reads from and writes to -> (left, right, result)
+# NOTE: PARAM writes into the called function's memory, so it doesn't count as a write here
+read_operands = {
+  '=': (1,),
+  '$': (1,),
+  '!': (1,),
+  '?': (1,),
+  '·': (1, 2),
+  'GoToF': (1,),
+  'PRINT': (3,),
+  'VERIFY': (1,),
+  '+->': (1,),
+  'PARAM': (1,),
+  'RETURN': (3,)
+}
+write_operands = {
+  '=': (3,),
+  '$': (3,),
+  '!': (3,),
+  '?': (3,),
+  '·': (3,),
+  'READ': (3,),
+  '+->': (3,),
+  '=>': (3,)
+}
+dual_ops = ['+', '-', '/', '*', '%', '==', '!=', '<', '<=', '>', '>=', '&', '|']
+for op in dual_ops:
+  read_operands[op] = (1, 2)
+  write_operands[op] = (3,)
+
+# Operations that only use the size of their MAT, not its dimensions
+sized_ops = dual_ops + ['=', 'GoToF', 'PRINT', 'READ', 'PARAM', 'RETURN', '=>']
+
+# Operations that end a basic block
+jump_ops = ['GoTo', 'GoToF']
+exit_ops = ['RETURN', 'EndFunc', 'END']
+
+# Get the cells each operand of a quad spans -> (left, right, result), given the MAT before it (if any)
+def getOperandSizes(op, mat):
+  if mat is None:
+    return (1, 1, 1)
+  elif mat[0] == 'MAT·':     # Dot products: [rows][inner] · [inner][cols]
+    return (mat[1] * mat[2], mat[2] * mat[3], mat[1] * mat[3])
+
+  size = mat[1] * mat[2]
+  if op == '$':
+    return (size, 1, 1)
+  return (size, size, size)
+
+# Get the function every quad range belongs to -> [(function, start, end)], main last
+# NOTE: Follows the same layout as profiler.getQuadFunctions(), quad 0 (the jump to main) belongs to none
+def getFunctionRanges(program):
+  ranges = []
+  quads = program['quads']
+  start = 1
+  for era in program['eras']:
+    end = start
+    while quads[end][0] != 'EndFunc':
+      end += 1
+    ranges.append((era[0], start, end + 1))
+    start = end + 1
+  ranges.append(('main', start, len(quads)))
+  return ranges
+
+# Build the flow graph of every function of a program -> {function: FlowGraph}
+def buildGraphs(program):
+  return {func: FlowGraph(program['quads'], start, end, func == 'main') for func, start, end in getFunctionRanges(program)}
+
+class BasicBlock:
+  def __init__(self, index, start, end):
+    self.index = index
+    self.start = start    # First quad
+    self.end = end        # One past the last quad
+    self.succs = []
+    self.preds = []
+    self.exits = False    # Whether the function may be left from the block
+
+  # Get the indexes of the block's quads
+  def getQuads(self):
+    return range(self.start, self.end)
+
+  # Get the index of the block's last quad
+  def getLast(self):
+    return self.end - 1
+
+# Basic blocks of a single function (the quads from start to end) and the jumps between them
+# NOTE: Only the function's own jumps are followed. Calls (GoSub) end a block, but flow on to the next
+# quad once the function called returns. Jumps out of the range (like one to an EndFunc not yet added)
+# just leave the function, the same as RETURN, EndFunc and END do
+class FlowGraph:
+  def __init__(self, quads, start, end, isMain=False, vDir=None):
+    self.quads = quads
+    self.start = start
+    self.end = end
+    self.isMain = isMain
+    self.vDir = vDir or VirtualDirectory()
+    self.blocks = []
+    self.blockOf = [None] * (end - start)     # Quad (minus start) -> its block
+
+    self.buildBlocks()
+    self.buildEffects()
+
+  ## BUILDING
+  # Split the quads into basic blocks and connect them
+  def buildBlocks(self):
+    quads = self.quads
+    leaders = {self.start}
+    for i in range(self.start, self.end):
+      op = quads[i][0]
+      if op in jump_ops:
+        target = quads[i][3]
+        if self.start <= target < self.end:
+          leaders.add(target)
+      if op in jump_ops or op in exit_ops or op == 'GoSub':
+        leaders.add(i + 1)
+
+    starts = sorted(i for i in leaders if i < self.end)
+    for index, start in enumerate(starts):
+      end = starts[index + 1] if index + 1 < len(starts) else self.end
+      block = BasicBlock(index, start, end)
+      self.blocks.append(block)
+      for i in range(start, end):
+        self.blockOf[i - self.start] = block
+
+    for block in self.blocks:
+      last = quads[block.getLast()]
+      targets = []
+      if last[0] in jump_ops:
+        targets.append(last[3])
+      if last[0] not in exit_ops and last[0] != 'GoTo':
+        targets.append(block.end)
+
+      if last[0] in exit_ops:
+        block.exits = True
+
+      for target in targets:
+        if not self.start <= target < self.end:
+          block.exits = True
+          continue
+
+        succ = self.getBlock(target)
+        if succ not in block.succs:
+          block.succs.append(succ)
+          succ.preds.append(block)
+
+  # Get what every quad reads (uses) and writes (defs), as sets of addresses
+  # NOTE: Constants are left out, since they never change. Reads through a pointer could be of any variable,
+  # and so could whatever a call reads, so they count as reading every variable (or global) the function names.
+  # Writes through a pointer or by a call might not happen, so they don't count as writes
+  def buildEffects(self):
+    quads = self.quads
+    cteStart = self.vDir.cteRanges[0]
+    tempStart = self.vDir.tempRanges[0]
+    globalEnd = self.vDir.globalRanges[4]
+
+    # Get the cells an operand spans, None for constants and pointers
+    def cells(addr, size):
+      if addr & POINTER_BIT or addr >= cteStart:
+        return None
+      return (addr,) if size == 1 else range(addr, addr + size)
+
+    operands = []
+    named = set()
+    for i in range(self.start, self.end):
+      q = quads[i]
+      op = q[0]
+      reads, writes = [], []
+      if op in read_operands or op in write_operands:
+        mat = quads[i - 1] if i > 0 and quads[i - 1][0] in ['MAT', 'MAT·'] else None
+        sizes = getOperandSizes(op, mat)
+        for pos in read_operands.get(op, ()):
+          if isinstance(q[pos], int):
+            reads.append((q[pos], cells(q[pos], sizes[pos - 1])))
+        for pos in write_operands.get(op, ()):
+          if isinstance(q[pos], int):
+            writes.append((q[pos], cells(q[pos], sizes[pos - 1])))
+        for addr, span in reads + writes:
+          if span is not None:
+            named.update(span)
+      operands.append((reads, writes))
+
+    self.variables = frozenset(addr for addr in named if addr < tempStart)
+    self.globals = frozenset(addr for addr in named if addr < globalEnd)
+
+    self.uses = []
+    self.defs = []
+    for i, (reads, writes) in zip(range(self.start, self.end), operands):
+      uses, defs = set(), set()
+      for addr, span in reads:
+        if span is not None:
+          uses.update(span)
+        elif addr & POINTER_BIT:
+          uses.add(addr & ~POINTER_BIT)
+          uses.update(self.variables)
+
+      for addr, span in writes:
+        if span is not None:
+          defs.update(span)
+        else:
+          uses.add(addr & ~POINTER_BIT)
+
+      if quads[i][0] == 'GoSub':
+        uses.update(self.globals)
+
+      self.uses.append(frozenset(uses))
+      self.defs.append(frozenset(defs))
+
+  ## GETTERS
+  # Get the block a quad belongs to
+  def getBlock(self, i):
+    return self.blockOf[i - self.start]
+
+  # Get the block the function starts at
+  def getEntry(self):
+    return self.blocks[0]
+
+  # Get the addresses a quad reads
+  def getUses(self, i):
+    return self.uses[i - self.start]
+
+  # Get the addresses a quad writes
+  def getDefs(self, i):
+    return self.defs[i - self.start]
+
+  # Get the addresses still needed once the function is left
+  # NOTE: Whoever called a function may read any global afterwards, nothing is read after main
+  def getExitUses(self):
+    return frozenset() if self.isMain else self.globals
+
+  # Get every block that can be reached from the entry, in reverse postorder
+  def getReversePostorder(self):
+    order = []
+    visited = set()
+    stack = [(self.getEntry(), iter(self.getEntry().succs))]
+    visited.add(self.getEntry().index)
+    while stack:
+      block, succs = stack[-1]
+      for succ in succs:
+        if succ.index not in visited:
+          visited.add(succ.index)
+          stack.append((succ, iter(succ.succs)))
+          break
+      else:
+        stack.pop()
+        order.append(block)
+    order.reverse()
+    return order
+
+  # Get the blocks no path from the entry reaches
+  def getUnreachable(self):
+    reachable = {block.index for block in self.getReversePostorder()}
+    return [block for block in self.blocks if block.index not in reachable]
+
+  # Print every block, its quads and where it flows to
+  def printGraph(self):
+    for block in self.blocks:
+      print(f'B{block.index} ({block.start} - {block.end - 1}) -> {[succ.index for succ in block.succs]}')
+      for i in block.getQuads():
+        q = self.quads[i]
+        print(f'  {i}:\t{q[0]}\t{q[1]}\t{q[2]}\t{q[3]}')
+
+## ANALYSES
+# Variables live in and out of every block, and after every quad
+# NOTE: A variable is live after a quad if some path from there reads it before writing it again.
+# Given which quads could be removed once nothing reads what they write, reads by those quads only count
+# while what they write is live (strong liveness), so chains of dead quads are found in a single go
+class Liveness:
+  def __init__(self, graph, removable=None):
+    self.graph = graph
+    self.removable = removable
+    self.liveIn = [frozenset()] * len(graph.blocks)
+    self.liveOut = [frozenset()] * len(graph.blocks)
+
+    # What each block reads before writing it (gen) and writes (kill)
+    # NOTE: Only fixed when no quad can be removed, otherwise it depends on what's live after the block
+    self.gen = []
+    self.kill = []
+    if removable is None:
+      for block in graph.blocks:
+        gen, kill = set(), set()
+        for i in reversed(block.getQuads()):
+          gen -= graph.getDefs(i)
+          kill |= graph.getDefs(i)
+          gen |= graph.getUses(i)
+        self.gen.append(frozenset(gen))
+        self.kill.append(frozenset(kill))
+
+    self.solve()
+
+  # Iterate until nothing changes, going backwards so it settles quickly
+  def solve(self):
+    exitUses = self.graph.getExitUses()
+    pending = list(self.graph.blocks)
+    queued = {block.index for block in pending}
+    while pending:
+      block = pending.pop()
+      queued.discard(block.index)
+
+      liveOut = set(exitUses) if block.exits else set()
+      for succ in block.succs:
+        liveOut |= self.liveIn[succ.index]
+      self.liveOut[block.index] = frozenset(liveOut)
+
+      liveIn = self.transfer(block, liveOut)
+      if liveIn != self.liveIn[block.index]:
+        self.liveIn[block.index] = liveIn
+        for pred in block.preds:
+          if pred.index not in queued:
+            queued.add(pred.index)
+            pending.append(pred)
+
+  # Get what's live before a block, given what's live after it
+  def transfer(self, block, liveOut):
+    if self.removable is None:
+      return self.gen[block.index] | (liveOut - self.kill[block.index])
+
+    live = set(liveOut)
+    for i in reversed(block.getQuads()):
+      if not self.isDead(i, live):
+        live -= self.graph.getDefs(i)
+        live |= self.graph.getUses(i)
+    return frozenset(live)
+
+  ## GETTERS
+  # Check if a quad could be removed and nothing reads what it writes, given what's live after it
+  def isDead(self, i, live):
+    defs = self.graph.getDefs(i)
+    return self.removable is not None and bool(defs) and not defs & live and self.removable(i)
+
+  # Get the variables live right after every quad of a block -> {quad: variables}
+  def getLiveAfter(self, block):
+    live = set(self.liveOut[block.index])
+    liveAfter = dict()
+    for i in reversed(block.getQuads()):
+      liveAfter[i] = frozenset(live)
+      if not self.isDead(i, live):
+        live -= self.graph.getDefs(i)
+        live |= self.graph.getUses(i)
+    return liveAfter
+
+  # Get the quads of a block that could be removed, since nothing reads what they write
+  def getDeadQuads(self, block):
+    live = set(self.liveOut[block.index])
+    dead = []
+    for i in reversed(block.getQuads()):
+      if self.isDead(i, live):
+        dead.append(i)
+      else:
+        live -= self.graph.getDefs(i)
+        live |= self.graph.getUses(i)
+    return dead
+
+  # Check if a variable is read at some point after a quad
+  def isLiveAfter(self, i, addr):
+    return addr in self.getLiveAfter(self.graph.getBlock(i))[i]
+
+# Writes that may reach every block, as (quad, address) pairs
+# NOTE: Writes through pointers and calls aren't counted, so they don't hide earlier writes either
+class ReachingDefinitions:
+  def __init__(self, graph):
+    self.graph = graph
+    self.defsOf = dict()      # Address -> its writes
+    for block in graph.blocks:
+      for i in block.getQuads():
+        for addr in graph.getDefs(i):
+          self.defsOf.setdefault(addr, set()).add((i, addr))
+
+    # What each block writes last (gen) and what its writes hide (kill)
+    self.gen = []
+    self.kill = []
+    for block in graph.blocks:
+      gen, kill = set(), set()
+      for i in block.getQuads():
+        for addr in graph.getDefs(i):
+          gen -= self.defsOf[addr]
+          kill |= self.defsOf[addr]
+          gen.add((i, addr))
+      self.gen.append(frozenset(gen))
+      self.kill.append(frozenset(kill - gen))
+
+    self.reachIn = [frozenset()] * len(graph.blocks)
+    self.reachOut = list(self.gen)
+    self.solve()
+
+  # Iterate until nothing changes, going forwards so it settles quickly
+  def solve(self):
+    pending = list(reversed(self.graph.getReversePostorder()))
+    queued = {block.index for block in pending}
+    while pending:
+      block = pending.pop()
+      queued.discard(block.index)
+
+      reachIn = set()
+      for pred in block.preds:
+        reachIn |= self.reachOut[pred.index]
+      self.reachIn[block.index] = frozenset(reachIn)
+
+      reachOut = self.gen[block.index] | (self.reachIn[block.index] - self.kill[block.index])
+      if reachOut != self.reachOut[block.index]:
+        self.reachOut[block.index] = reachOut
+        for succ in block.succs:
+          if succ.index not in queued:
+            queued.add(succ.index)
+            pending.append(succ)
+
+  ## GETTERS
+  # Get the quads whose write of an address may reach a quad (before it runs)
+  def getReaching(self, i, addr):
+    block = self.graph.getBlock(i)
+    for j in range(i - 1, block.start - 1, -1):
+      if addr in self.graph.getDefs(j):
+        return {j}
+    return {d for d, defAddr in self.reachIn[block.index] if defAddr == addr}
+
+# Blocks every path from the entry goes through to reach each block
+# NOTE: Only reachable blocks are dominated (and dominate) at all
+class Dominators:
+  def __init__(self, graph):
+    self.graph = graph
+    self.order = graph.getReversePostorder()
+    self.position = {block.index: n for n, block in enumerate(self.order)}
+    self.idom = {self.order[0].index: self.order[0].index}
+    self.solve()
+
+  # Find immediate dominators, walking up the tree until both sides meet (Cooper, Harvey & Kennedy)
+  def solve(self):
+    changed = True
+    while changed:
+      changed = False
+      for block in self.order[1:]:
+        preds = [pred.index for pred in block.preds if pred.index in self.idom]
+        idom = preds[0]
+        for pred in preds[1:]:
+          idom = self.intersect(pred, idom)
+        if self.idom.get(block.index) != idom:
+          self.idom[block.index] = idom
+          changed = True
+
+  # Get the closest common dominator of two blocks
+  def intersect(self, a, b):
+    while a != b:
+      while self.position[a] > self.position[b]:
+        a = self.idom[a]
+      while self.position[b] > self.position[a]:
+        b = self.idom[b]
+    return a
+
+  ## GETTERS
+  # Get a block's immediate dominator (the entry is its own)
+  def getIdom(self, block):
+    return self.graph.blocks[self.idom[block.index]]
+
+  # Check if every path from the entry to block b goes through block a
+  def dominates(self, a, b):
+    if b.index not in self.idom:
+      return False
+    node = b.index
+    while node != a.index:
+      if node == self.idom[node]:
+        return False
+      node = self.idom[node]
+    return True
+
+  # Get the jumps back to a block that dominates them (loop tails -> headers)
+  def getBackEdges(self):
+    return [(block, succ) for block in self.order for succ in block.succs if self.dominates(succ, block)]
+
+  # Get the blocks of the loop formed by a back edge, header included
+  def getLoop(self, tail, header):
+    body = {header.index, tail.index}
+    pending = [tail] if tail is not header else []
+    while pending:
+      block = pending.pop()
+      for pred in block.preds:
+        if pred.index not in body and pred.index in self.idom:
+          body.add(pred.index)
+          pending.append(pred)
+    return [self.graph.blocks[index] for index in sorted(body)]
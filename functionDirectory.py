@@ -1,5 +1,4 @@
 
-import config
 from collections import defaultdict
 
 ## -- CONSTANT
@@ -21,8 +20,8 @@ class Var():
 
 ## -- FUNCTION
 class Function():
-  def __init__(self, name, returnType):
-    self.debug = config.debugParser
+  def __init__(self, name, returnType, debug=False):
+    self.debug = debug
     self.name = name
     self.returnType = returnType
     self.returnAddr = None
@@ -41,6 +40,19 @@ class Function():
   def getDimensionsOfVar(self, name):
     return self.varTable[name].dims
 
+  # Get every address taken up by arrays and matrices
+  def getArrayAddrs(self):
+    addrs = set()
+    if self.varTable is None:     # Functions without a var section
+      return addrs
+    for v in self.varTable.values():
+      if v.dims:
+        space = 1
+        for d in v.dims:
+          space *= d
+        addrs.update(range(v.vAddr, v.vAddr + space))
+    return addrs
+
   # Get return address for function
   def getReturnAddr(self):
     return self.returnAddr
@@ -107,8 +119,8 @@ class Function():
 
 ## -- FUNCTION DIRECTORY
 class FunctionDirectory():
-  def __init__(self):
-    self.debug = config.debugParser
+  def __init__(self, debug=False):
+    self.debug = debug
     self.directory = dict()
     self.cteTable = dict()
     self.globalFunc = None
@@ -199,6 +211,14 @@ class FunctionDirectory():
   def getParamOfFunc(self, func):
     return self.directory[func].paramTable[self.paramCount]
 
+  # Get addresses of every parameter of a function
+  def getParamAddrsOfFunc(self, func):
+    return [param[1] for param in self.directory[func].paramTable]
+
+  # Get addresses taken up by arrays and matrices in the current function
+  def getCurrentFuncArrayAddrs(self):
+    return self.directory[self.currentFunc].getArrayAddrs()
+
   # Get quadStart of function
   def getQuadStartOfFunc(self, func):
     return self.directory[func].quadStart
@@ -245,7 +265,7 @@ class FunctionDirectory():
   ## PUSH/ADD
   # Adds function to the directory
   def addFunction(self, name):
-    self.directory[name] = Function(name, self.currentType)
+    self.directory[name] = Function(name, self.currentType, self.debug)
     self.currentFunc = name
 
     if self.debug:
@@ -1,65 +1,126 @@
 
-import config
-from sys import argv
+from sys import argv, exit, stdin, stderr
 from os import path
 import argparse
-from ply import lex, yacc
+
+# Batch mode: honk.py batch <directory or manifest>
+if argv[1:2] == ['batch']:
+  batchCli = argparse.ArgumentParser(prog='honk.py batch', description='h o n k (a lot)')
+  batchCli.add_argument('target', help='Directory of programs, or a manifest listing them (and their stdin fixtures)')
+  batchCli.add_argument('-o', '--report', help='Write the JSON report to a file instead of printing it')
+  batchCli.add_argument('-j', '--workers', type=int, help='Number of worker processes (defaults to one per core)')
+  batchCli.add_argument('--timeout', type=float, help='Seconds each program may take')
+  batchCli.add_argument('--no-cache', help="Don't reuse or cache compiled programs", action='store_true')
+  batchArgs = batchCli.parse_args(argv[2:])
+
+  from honkBatch import batch
+  result = batch(batchArgs.target, batchArgs.report, batchArgs.workers, batchArgs.timeout, not batchArgs.no_cache)
+  exit(1 if result['failed'] else 0)
 
 # CLI Arguments
 cli = argparse.ArgumentParser(description='h o n k')
 cli.add_argument('-t', '--tokens', help='Print tokens', action='store_true')
 cli.add_argument('-p', '--parser', help='Enable debug info for parsing', action='store_true')
 cli.add_argument('-v', '--vm', help='Enable debug info for virtual machine', action='store_true')
-cli.add_argument('file', help='Specify a file to run through')
+cli.add_argument('-n', '--no-obj', help="Don't write the .o file", action='store_true')
+cli.add_argument('--text-obj', help='Write the .o file as text, for debugging', action='store_true')
+cli.add_argument('--profile', help='Profile the run, dumping it as JSON to <file>.prof.json', action='store_true')
+cli.add_argument('--profile-out', metavar='FILE', help='Dump the run profile to FILE instead (implies --profile)')
+cli.add_argument('--call-profile', help='Profile function calls, dumping collapsed stacks to <file>.folded', action='store_true')
+cli.add_argument('--call-profile-out', metavar='FILE', help='Dump the collapsed stacks to FILE instead (implies --call-profile)')
+cli.add_argument('--no-cache', help="Don't reuse or cache compiled programs", action='store_true')
+cli.add_argument('--serve', metavar='SOCKET', help='Serve compile and run requests on a Unix socket')
+cli.add_argument('--workers', type=int, help='Number of worker processes when serving')
+cli.add_argument('--daemon', metavar='SOCKET', help='Run the file through the server listening on a Unix socket')
+cli.add_argument('file', nargs='?', help='Specify a file to run through (source, or an already built .o file)')
 args = cli.parse_args()
 
-# Set configuration before importing lexer and parser
-filepath = path.splitext(args.file)
-config.objFilename = filepath[0]
-config.debugParser = args.parser
+# Serve requests, keeping everything warm between them
+if args.serve:
+  from honkServer import serve
+  serve(args.serve, args.workers)
+  exit()
+
+if args.file is None:
+  cli.error('the following arguments are required: file')
+
+profile = args.profile or args.profile_out is not None
+callProfile = args.call_profile or args.call_profile_out is not None
+
+# NOTE: The VM runs a single loop, and the tracing one doesn't time quads (printing would skew them anyway)
+if profile and args.vm:
+  cli.error('--profile can\'t be used together with -v/--vm')
+
+# Let a running server do the work, skipping all of the startup
+if args.daemon:
+  from honkClient import sendRequest
+  request = {'action': 'run', 'file': path.abspath(args.file)}
+  if not stdin.isatty():
+    request['input'] = stdin.read()
 
-# Import the brains and machines
-if filepath[1] == '.honk':
-  import lexhonker as lexer, parshonker as parser
-else:
-  import lexer, parser
+  response = sendRequest(args.daemon, request)
+  print(response['stdout'], end='')
+  if response['error']:
+    print(response['error'], file=stderr)
+  exit(response['status'])
 
+filepath = path.splitext(args.file)
+
+# NOTE: Only imported now, so handing a file over to a server never pays for them
 from honkVM import honk
+from objFile import readObj, writeObj, writeBinaryObj
+from compiler import Compiler, getDialect
+from compileCache import CompileCache
+
+# Show where a run spent its time, keeping machine-readable copies next to the source
+def reportProfiles(vm, source=None):
+  if vm.profile:
+    vm.profile.report(source)
+    vm.profile.dump(args.profile_out or f'{filepath[0]}.prof.json')
+  if vm.callProfile:
+    vm.callProfile.report()
+    vm.callProfile.dump(args.call_profile_out or f'{filepath[0]}.folded')
+
+# Run an already built program straight away
+if filepath[1] == '.o':
+  reportProfiles(honk(readObj(args.file), args.vm, profile, callProfile))
+  exit()
 
 # Read file
-data = ''
 try:
   with open(args.file) as f:
-    for line in f:
-      data += line
+    data = f.read()
 except FileNotFoundError:
   raise Exception(f'{args.file} does not exist!')
 
-# Scan file
-ducklexer = lex.lex(module=lexer)
-ducklexer.input(data)
+# Look for an already compiled program
+# NOTE: Printing tokens or parser debug info needs the full compilation, so it skips the cache
+dialect = getDialect(args.file)
+objFilename = None if args.no_obj and not args.text_obj else f'{filepath[0]}.o'
+cache = None
+program = None
+if not (args.no_cache or args.tokens or args.parser):
+  cache = CompileCache()
+  key = cache.getKey(data, dialect)
+  program = cache.get(key)
 
-# Print tokens when allowed
-if args.tokens:
-  while True:
-    token = ducklexer.token()
-    if not token:
-      break
-    print(token)
+if program is None:
+  compiler = Compiler(dialect, args.parser)
 
-# Parse file and build .o file)
-duckparser = yacc.yacc(module=parser)
-resultQM = duckparser.parse(data)
+  # Print tokens when allowed
+  if args.tokens:
+    for token in compiler.getTokens(data):
+      print(token)
 
-# Read .o file
-data = ''
+  # Compile file, building its .o file along the way
+  program = compiler.compile(data, objFilename, args.text_obj)
 
-try:
-  with open(f'{config.objFilename}.o') as f:
-    for line in f:
-      data += line
-except FileNotFoundError:
-  raise Exception(f'{config.objFilename}.o does not exist!')
+  if cache:
+    cache.put(key, program)
+elif objFilename and args.text_obj:
+  writeObj(program, objFilename)
+elif objFilename:
+  writeBinaryObj(program, objFilename)
 
-# Honk away
-honk(data, args.vm)
+# Honk away, handing the program over in memory
+reportProfiles(honk(program, args.vm, profile, callProfile), data)
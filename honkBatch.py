@@ -0,0 +1,101 @@
+import json
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from honkServer import warmUp, initWorker, handleRequest
+
+# Extensions of the programs picked up from a directory
+source_extensions = ('.duck', '.honk')
+
+# Extension of a program's stdin fixture, found right next to it (fib.duck -> fib.in)
+FIXTURE_EXTENSION = '.in'
+
+## JOBS
+# Get the fixture sitting next to a program, if there is one
+def findFixture(filename):
+  fixture = os.path.splitext(filename)[0] + FIXTURE_EXTENSION
+  return fixture if os.path.isfile(fixture) else None
+
+# Get every program in a directory (and its subdirectories) as (program, fixture) pairs
+def collectDirectory(folder):
+  jobs = []
+  for root, dirs, files in os.walk(folder):
+    dirs.sort()
+    for name in sorted(files):
+      if name.endswith(source_extensions):
+        filename = os.path.join(root, name)
+        jobs.append((filename, findFixture(filename)))
+  return jobs
+
+# Get the programs listed in a manifest as (program, fixture) pairs
+# NOTE: One program per line, optionally followed by its fixture. Paths are relative to the manifest,
+# blank lines and lines starting with # are skipped
+def collectManifest(manifest):
+  folder = os.path.dirname(os.path.abspath(manifest))
+  jobs = []
+  with open(manifest) as f:
+    for number, line in enumerate(f, 1):
+      fields = line.split()
+      if not fields or fields[0].startswith('#'):
+        continue
+      elif len(fields) > 2:
+        raise Exception(f'({number}) Expected a program and at most one fixture in {manifest}!')
+
+      filename = os.path.join(folder, fields[0])
+      fixture = os.path.join(folder, fields[1]) if len(fields) == 2 else findFixture(filename)
+      jobs.append((filename, fixture))
+  return jobs
+
+# Get the jobs of a directory or a manifest
+def collectJobs(target):
+  if os.path.isdir(target):
+    return collectDirectory(target)
+  elif os.path.isfile(target):
+    return collectManifest(target)
+  raise Exception(f'{target} does not exist!')
+
+# Get the request that compiles and runs a job
+def makeRequest(filename, fixture, timeout=None):
+  request = {'action': 'run', 'file': os.path.abspath(filename), 'timeout': timeout}
+  if fixture:
+    with open(fixture) as f:
+      request['input'] = f.read()
+  return request
+
+## RUNNING
+# Compile and run every job across a pool of workers, getting back a report of how each went
+# NOTE: Compilers are built before the workers are forked, so no job pays for the startup
+def runBatch(jobs, workers=None, timeout=None, useCache=True):
+  workers = workers or os.cpu_count() or 1
+  start = time.perf_counter()
+  warmUp()
+
+  requests = [makeRequest(filename, fixture, timeout) for filename, fixture in jobs]
+  with ProcessPoolExecutor(workers, multiprocessing.get_context('fork'), initializer=initWorker, initargs=(useCache,)) as pool:
+    responses = list(pool.map(handleRequest, requests))
+
+  results = []
+  for (filename, fixture), response in zip(jobs, responses):
+    results.append({'file': filename, 'stdin': fixture, **response})
+
+  failed = sum(1 for result in results if result['status'] != 0)
+  return {
+    'jobs': len(results),
+    'passed': len(results) - failed,
+    'failed': failed,
+    'workers': workers,
+    'wall': time.perf_counter() - start,
+    'results': results
+  }
+
+# Run a directory or manifest of programs, writing the report to a file (or printing it)
+def batch(target, report=None, workers=None, timeout=None, useCache=True):
+  result = runBatch(collectJobs(target), workers, timeout, useCache)
+
+  if report:
+    with open(report, 'w') as f:
+      json.dump(result, f, indent=2)
+  else:
+    print(json.dumps(result, indent=2))
+  return result
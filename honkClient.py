@@ -0,0 +1,18 @@
+import json
+import socket
+
+# NOTE: Kept apart from honkServer so clients start up without importing the compiler or the VM.
+# Requests and responses are described in honkServer
+
+# Send a request to a server, getting its response back
+def sendRequest(socketPath, request):
+  with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+    sock.connect(socketPath)
+    with sock.makefile('rwb') as f:
+      f.write(json.dumps(request).encode() + b'\n')
+      f.flush()
+      line = f.readline()
+
+  if not line:
+    raise Exception('Server hung up!')
+  return json.loads(line)
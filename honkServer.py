@@ -0,0 +1,227 @@
+import io
+import json
+import os
+import signal
+import socketserver
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stdout
+import multiprocessing
+from compiler import Compiler, getDialect, dialect_modules
+from compileCache import CompileCache
+from objFile import readObj, writeObj, writeBinaryObj
+from honkVM import honk
+
+# Requests and responses are JSON objects, one per line:
+# -> {"action": "compile" | "run", "file": path, "source": text, "dialect": name, "output": path,
+#     "textObj": bool, "input": text, "timeout": seconds}
+# <- {"status": 0 | 1, "stdout": text, "error": text, "timing": {"compile": s, "run": s, "total": s}}
+# NOTE: Either a file (source or .o) or the source itself is given. Paths are read by the server,
+# so they must make sense on its side of the socket
+
+# Seconds a request may take before its worker gives up on it
+DEFAULT_TIMEOUT = 60
+
+# Biggest request accepted, in bytes
+MAX_REQUEST_SIZE = 16 * 1024 * 1024
+
+# Raised inside a worker when a request runs out of time
+class RequestTimeout(Exception):
+  pass
+
+## WORKERS
+# NOTE: Every worker process keeps one compiler per dialect, built the first time it's needed.
+# Requests run one at a time in each worker, which is what lets them take over stdin and stdout
+compilers = dict()
+cache = None
+
+# Build every dialect's compiler (lexer rules and parse tables)
+# NOTE: Done before forking workers, they inherit them instead of each building their own
+def warmUp():
+  for dialect in dialect_modules:
+    getCompiler(dialect)
+
+# Get up to speed before the first request arrives
+# NOTE: Given a barrier, waits there until every other worker is up to speed too
+def initWorker(useCache=True, ready=None):
+  global cache
+  signal.signal(signal.SIGINT, signal.SIG_IGN)    # Shutting down is up to whoever started the workers
+  cache = CompileCache() if useCache else None
+  warmUp()
+  if ready is not None:
+    ready.wait(DEFAULT_TIMEOUT)
+
+# Get a worker's compiler for a dialect
+def getCompiler(dialect):
+  if dialect not in compilers:
+    compilers[dialect] = Compiler(dialect)
+  return compilers[dialect]
+
+# Give up on a request that took too long
+def _onTimeout(signum, frame):
+  raise RequestTimeout()
+
+# Compile a request's source, going through the cache when there is one
+def compileRequest(request):
+  if request.get('source') is not None:
+    source = request['source']
+    dialect = request.get('dialect') or 'standard'
+  else:
+    with open(request['file']) as f:
+      source = f.read()
+    dialect = request.get('dialect') or getDialect(request['file'])
+
+  key = cache.getKey(source, dialect) if cache else None
+  program = cache.get(key) if cache else None
+  if program is None:
+    program = getCompiler(dialect).compile(source)
+    if cache:
+      cache.put(key, program)
+
+  if request.get('output') and request.get('textObj'):
+    writeObj(program, request['output'])
+  elif request.get('output'):
+    writeBinaryObj(program, request['output'])
+  return program
+
+# Check that a request has everything it needs, and that every field has the right type
+def validateRequest(request):
+  if not isinstance(request, dict):
+    raise Exception('Malformed request, expected a JSON object!')
+
+  action = request.get('action')
+  if action not in ('compile', 'run'):
+    raise Exception(f'Unknown action "{action}"!')
+  if request.get('file') is None and request.get('source') is None:
+    raise Exception('Malformed request, either "file" or "source" is required!')
+
+  for field in ['file', 'source', 'dialect', 'output', 'input']:
+    if request.get(field) is not None and not isinstance(request[field], str):
+      raise Exception(f'Malformed request, "{field}" must be a string!')
+  if request.get('dialect') is not None and request['dialect'] not in dialect_modules:
+    raise Exception(f'Unknown dialect "{request["dialect"]}"!')
+  timeout = request.get('timeout')
+  if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0):
+    raise Exception('Malformed request, "timeout" must be a positive number of seconds!')
+
+# Handle a single request, isolated from every other one
+def handleRequest(request):
+  stdout = io.StringIO()
+  response = {'status': 0, 'stdout': '', 'error': None, 'timing': {}}
+  start = time.perf_counter()
+
+  signal.signal(signal.SIGALRM, _onTimeout)
+  signal.setitimer(signal.ITIMER_REAL, request.get('timeout') or DEFAULT_TIMEOUT)
+  stdin = sys.stdin
+  sys.stdin = io.StringIO(request.get('input') or '')
+  try:
+    with redirect_stdout(stdout):
+      action = request.get('action')
+      if action not in ('compile', 'run'):
+        raise Exception(f'Unknown action "{action}"!')
+
+      if action == 'run' and (request.get('file') or '').endswith('.o'):
+        program = readObj(request['file'])
+      else:
+        program = compileRequest(request)
+      response['timing']['compile'] = time.perf_counter() - start
+
+      if action == 'run':
+        runStart = time.perf_counter()
+        honk(program)
+        response['timing']['run'] = time.perf_counter() - runStart
+  except RequestTimeout:
+    response['status'] = 1
+    response['error'] = 'Request timed out!'
+  except Exception as e:
+    response['status'] = 1
+    response['error'] = str(e) or type(e).__name__
+  finally:
+    signal.setitimer(signal.ITIMER_REAL, 0)
+    sys.stdin = stdin
+
+  response['stdout'] = stdout.getvalue()
+  response['timing']['total'] = time.perf_counter() - start
+  return response
+
+## SERVER
+# Connection handler, answering every request sent through a connection
+class RequestHandler(socketserver.StreamRequestHandler):
+  def handle(self):
+    while True:
+      line = self.rfile.readline(MAX_REQUEST_SIZE + 1)
+      if not line:
+        return
+
+      # The rest of a request that's too big can't be told apart from the next one, so give up on the connection
+      if len(line) > MAX_REQUEST_SIZE:
+        self.respond({'status': 1, 'stdout': '', 'error': 'Request too big!', 'timing': {}})
+        return
+
+      try:
+        try:
+          request = json.loads(line)
+        except ValueError:
+          raise Exception('Malformed request, expected a JSON object!')
+        validateRequest(request)
+        response = self.server.submit(request)
+      except Exception as e:
+        response = {'status': 1, 'stdout': '', 'error': str(e), 'timing': {}}
+      self.respond(response)
+
+  # Send a response back
+  def respond(self, response):
+    self.wfile.write(json.dumps(response).encode() + b'\n')
+    self.wfile.flush()
+
+# Server listening on a Unix socket, handing requests over to a bounded pool of warm workers
+# NOTE: Workers are forked once everything is imported, so they start off warm. A worker that
+# dies takes the pool down with it, in which case a new one replaces it
+class HonkServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+  daemon_threads = True
+
+  def __init__(self, socketPath, workers=None):
+    self.socketPath = socketPath
+    self.workers = workers or os.cpu_count() or 1
+    self.pool = None
+    self.startPool()
+
+    # Take over sockets left behind by a server that didn't shut down cleanly
+    if os.path.exists(socketPath):
+      os.remove(socketPath)
+    super().__init__(socketPath, RequestHandler)
+
+  # Start a pool of workers, waiting for every one of them to be ready
+  # NOTE: Forked workers all start right away, and none gets past its initializer until every one of them
+  # has warmed up, so the first warm-up task finishing means they all have
+  def startPool(self):
+    warmUp()
+    context = multiprocessing.get_context('fork')
+    self.pool = ProcessPoolExecutor(self.workers, context, initializer=initWorker, initargs=(True, context.Barrier(self.workers)))
+    self.pool.submit(int).result()
+
+  # Run a request in the pool, waiting for its response
+  def submit(self, request):
+    pool = self.pool
+    try:
+      return pool.submit(handleRequest, request).result()
+    except BrokenProcessPool:
+      if self.pool is pool:
+        self.startPool()
+      raise Exception('Worker died while handling the request!')
+
+  def server_close(self):
+    super().server_close()
+    self.pool.shutdown(cancel_futures=True)
+    if os.path.exists(self.socketPath):
+      os.remove(self.socketPath)
+
+# Serve requests until interrupted
+def serve(socketPath, workers=None):
+  with HonkServer(socketPath, workers) as server:
+    try:
+      server.serve_forever()
+    except KeyboardInterrupt:
+      pass
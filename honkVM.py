@@ -1,122 +1,220 @@
-
 from collections import deque, defaultdict
-import re
+from semanticCube import dual_cube, dual_funcs, getDuoFunction, intDiv
+from virtualMemory import VirtualMemory
+from virtualDirectory import POINTER_BIT
+from objFile import parseObj, isBinaryObj, BinaryProgram
+from profiler import QuadProfile, CallProfile
+from time import perf_counter_ns
 import numpy as np
 
-class Var:
-  def __init__(self, value, vartype):
-    self.value = value
-    self.vartype = vartype
-
-  def getActualValue(self):
-    if self.vartype == 'int':       # Return int value
-      return int(self.value)
-    elif self.vartype == 'float':   # Return float value
-      return float(self.value)
-    else:                           # Return bool or char value
-      return self.value
+# Operation codes for decoded quads
+OPCODES = {
+  '+': 0, '-': 1, '/': 2, '*': 3, '%': 4,
+  '==': 5, '!=': 6, '<': 7, '<=': 8, '>': 9, '>=': 10, '&': 11, '|': 12,
+  '=': 13, '$': 14, '!': 15, '?': 16, 'MAT': 17, '·': 18, 'MAT·': 19,
+  'GoTo': 20, 'GoToF': 21, 'PRINT': 22, 'READ': 23, 'VERIFY': 24, '+->': 25,
+  'ERA': 26, 'PARAM': 27, 'GoSub': 28, 'RETURN': 29, '=>': 30, 'EndFunc': 31, 'END': 32
+}
+OPNAMES = {code: op for op, code in OPCODES.items()}
+
+# Operands holding an address for each operation -> (left, right, result)
+# NOTE: These get resolved into memory cells when decoding
+address_operands = {
+  '=': (True, False, True),
+  '$': (True, False, True),
+  '!': (True, False, True),
+  '?': (True, False, True),
+  '·': (True, True, True),
+  'GoToF': (True, False, False),
+  'PRINT': (False, False, True),
+  'READ': (False, False, True),
+  'VERIFY': (True, False, False),
+  '+->': (True, False, True),
+  'PARAM': (True, True, False),
+  'RETURN': (False, False, True),
+  '=>': (False, False, True)
+}
+for op in ['+', '-', '/', '*', '%', '==', '!=', '<', '<=', '>', '>=', '&', '|']:
+  address_operands[op] = (True, True, True)
+
+# Flags for operands holding a pointer rather than a plain address
+PTR_LEFT = 1
+PTR_RIGHT = 2
+PTR_RESULT = 4
+
+# Build dispatch table of (opcode, left type, right type) -> function, following the semantic cube
+def _buildDualDispatch():
+  dispatch = dict()
+  for left_type, rights in dual_cube.items():
+    for right_type, ops in rights.items():
+      for op in ops:
+        func = getDuoFunction(left_type, right_type, op)
+        if func:    # Skips '=' and '.', which have their own quads
+          dispatch[(OPCODES[op], left_type, right_type)] = func
+  return dispatch
+
+dual_dispatch = _buildDualDispatch()
+
+# Dividing by zero has to fail for whole blocks the same way it does for single values
+def _checkDivisor(right):
+  if not np.all(right):
+    raise ZeroDivisionError('division by zero')
+
+def _vecDiv(left, right):
+  _checkDivisor(right)
+  return np.true_divide(left, right)
+
+def _vecIntDiv(left, right):
+  _checkDivisor(right)
+  return np.trunc(np.true_divide(left, right))
+
+def _vecMod(left, right):
+  _checkDivisor(right)
+  return np.mod(left, right)
+
+# NumPy int blocks wrap around instead of overflowing like single values do, so int blocks are also run over
+# floats first, and those that come anywhere near leaving an int's range are redone over exact ints,
+# leaving the check to setValues()
+def _vecExactInts(func):
+  def vecFunc(left, right):
+    if left.dtype != np.int64 or right.dtype != np.int64 or not len(left):
+      return func(left, right)
+    if np.abs(func(left, right, dtype=np.float64)).max() >= 2 ** 62:
+      return func(left.astype(object), right.astype(object))
+    return func(left, right)
+  return vecFunc
+
+# Dot products of int matrices, following the same rule (going by the dot product of their absolute values,
+# which can't cancel out along the way)
+def _vecDot(left, right):
+  if left.dtype == np.int64 and right.dtype == np.int64 and left.size and right.size:
+    if np.dot(np.abs(left, dtype=np.float64), np.abs(right, dtype=np.float64)).max() >= 2 ** 62:
+      return np.dot(left.astype(object), right.astype(object))
+  return np.dot(left, right)
+
+# Vectorized counterpart of each native function, for batch (MAT-prefixed) quads
+vector_funcs = {
+  dual_funcs['+']: _vecExactInts(np.add),
+  dual_funcs['-']: _vecExactInts(np.subtract),
+  dual_funcs['*']: _vecExactInts(np.multiply),
+  dual_funcs['/']: _vecDiv,
+  intDiv: _vecIntDiv,
+  dual_funcs['%']: _vecMod,
+  dual_funcs['==']: np.equal,
+  dual_funcs['!=']: np.not_equal,
+  dual_funcs['<']: np.less,
+  dual_funcs['<=']: np.less_equal,
+  dual_funcs['>']: np.greater,
+  dual_funcs['>=']: np.greater_equal,
+  dual_funcs['&']: np.logical_and,
+  dual_funcs['|']: np.logical_or
+}
 
 class HonkVM:
-  def __init__(self, obj, debug=False):
+  # NOTE: A program holds the ranges, constants, ERAs and quads of a compiled Honk program,
+  # either straight from QuadManager.getProgram() or read from a .o file with readObj()
+  def __init__(self, program, debug=False, profile=False, callProfile=False):
     # For debugging purposes
     self.debug = debug
 
-    # Split lines and turn it into a queue
-    lines = deque(obj.split('\n'))
+    # Execution counts and times of every quad, only when profiling
+    self.profile = QuadProfile(program) if profile else None
 
-    # Get and set ranges
-    if lines.popleft() != '-> RANGES START':
-      self._ded()
+    # Calls and times of every function, only when profiling calls
+    self.callProfile = CallProfile(program) if callProfile else None
 
-    self.globalRanges = (self._stringsToNumbers(lines.popleft().split('\t')))
-    self.localRanges = (self._stringsToNumbers(lines.popleft().split('\t')))
-    self.tempRanges = (self._stringsToNumbers(lines.popleft().split('\t')))
-    self.cteRanges = (self._stringsToNumbers(lines.popleft().split('\t')))
+    # Get and set ranges
+    self.globalRanges, self.localRanges, self.tempRanges, self.cteRanges = program['ranges']
 
     self._debugMsg('Init', f'Global ranges: {self.globalRanges}')
     self._debugMsg('Init', f'Local ranges: {self.localRanges}')
     self._debugMsg('Init', f'Temp ranges: {self.tempRanges}')
     self._debugMsg('Init', f'Cte ranges: {self.cteRanges}')
 
-    if lines.popleft() != '->| RANGES END':
-      self._ded()
-
-    # NOTE: Locals and temps are in their own "stacks" for function calls
-    self.Globals = [None] * (self.globalRanges[4] - self.globalRanges[0])
-    self.Locals = [[None] * (self.localRanges[4] - self.localRanges[0])]
-    self.Temps = [[None] * (self.tempRanges[4] - self.tempRanges[0])]
-    self.Ctes = [None] * (self.cteRanges[4] - self.cteRanges[0])
-
-    self.LocalOffsets = [[0, 0, 0, 0]]
-    self.TempOffsets = [[0, 0, 0, 0]]
+    # Typed memory segments
+    self.memory = VirtualMemory([self.globalRanges, self.localRanges, self.tempRanges, self.cteRanges])
 
     # Get and set constants
-    if lines.popleft() != '-> CTES START':
-      self._ded()
-
-    while True:
-      line = lines.popleft()
-
-      if line == '->| CTES END':
-        break
-
-      data = line.split('\t')
-
-      addr = int(data[2]) - self.cteRanges[0]
-      self.Ctes[addr] = Var(data[0], data[1])
-      self._debugMsg('Init', f'{data[0]} -> ({data[2]})')
+    for value, vartype, vAddr in program['ctes']:
+      self.memory.setValue(value, self.memory.locate(vAddr))
+      self._debugMsg('Init', f'{value} -> ({vAddr})')
 
     # Prepare ERAs
+    # NOTE: Each function's frame layout is built once here and copied on every call
     self.eras = dict()
-
-    # Get and set ERAs
-    if lines.popleft() != '-> ERAS START':
-      self._ded()
-
-    while True:
-      line = lines.popleft()
-
-      if line == '->| ERAS END':
-        break
-
-      data = line.split('\t')
-      func = data[0]
-      local = self._stringsToNumbers(data[1:5])
-      temp = self._stringsToNumbers(data[5:9])
-      self.eras[func] = [local, temp]
-
+    for func, local, temp in program['eras']:
+      self.eras[func] = self.memory.createFrameTemplate([local, temp])
       self._debugMsg('Init', f'ERA - {func} -> {[local, temp]}')
 
-    # Get and set quads
-    self.quads = deque()
+    # Decode quads
+    self.quads = []
+    self.ptrTypes = dict()
+    for quad in program['quads']:
+      self.quads.append(self._decodeQuad(quad))
 
-    if lines.popleft() != '-> QUADS START':
-      self._ded()
+    self._attachMatDims()
 
-    while True:
-      line = lines.popleft()
-
-      if line == '->| QUADS END':
-        break
-
-      self.quads.append(line.split('\t'))
-
-    # Prepare for function calls & matrix operations
+    # Prepare for function calls
     self.sCalls = deque()
     self.sReturns = deque()
     self.sParams = deque()
-    self.localAux = [None]
-    self.tempAux = [None]
-
-    self.matHelper = (1, 1)
-
-  # Covert array of strings into ints
-  def _stringsToNumbers(self, arr):
-    return [int(i) for i in arr]
-
-  # VM init error
-  def _ded(self):
-    raise Exception('quack has commit die')
+    self.sFrames = deque()
+
+    # Handlers for every opcode, indexed by the opcode itself
+    self.handlers = [None] * len(OPCODES)
+    for op in ['+', '-', '/', '*', '%', '==', '!=', '<', '<=', '>', '>=', '&', '|']:
+      self.handlers[OPCODES[op]] = self.execDualOp
+    self.handlers[OPCODES['=']] = self.execAssign
+    self.handlers[OPCODES['$']] = self.execDeterminant
+    self.handlers[OPCODES['!']] = self.execTranspose
+    self.handlers[OPCODES['?']] = self.execInverse
+    self.handlers[OPCODES['MAT']] = self.execMat
+    self.handlers[OPCODES['·']] = self.execDotProduct
+    self.handlers[OPCODES['MAT·']] = self.execMat
+    self.handlers[OPCODES['GoTo']] = self.execGoTo
+    self.handlers[OPCODES['GoToF']] = self.execGoToF
+    self.handlers[OPCODES['PRINT']] = self.execPrint
+    self.handlers[OPCODES['READ']] = self.execRead
+    self.handlers[OPCODES['VERIFY']] = self.execVerify
+    self.handlers[OPCODES['+->']] = self.execBaseAddress
+    self.handlers[OPCODES['ERA']] = self.execEra
+    self.handlers[OPCODES['PARAM']] = self.execParam
+    self.handlers[OPCODES['GoSub']] = self.execGoSub
+    self.handlers[OPCODES['RETURN']] = self.execReturn
+    self.handlers[OPCODES['=>']] = self.execAssignReturn
+    self.handlers[OPCODES['EndFunc']] = self.execEndFunc
+    self.handlers[OPCODES['END']] = self.execEnd
+
+    # Keep track of stepping into and out of functions, only when profiling calls
+    if self.callProfile:
+      self.handlers[OPCODES['GoSub']] = self.callProfile.wrapCall(self.execGoSub)
+      self.handlers[OPCODES['RETURN']] = self.callProfile.wrapLeave(self.execReturn)
+      self.handlers[OPCODES['EndFunc']] = self.callProfile.wrapLeave(self.execEndFunc)
+
+    # Tracers for every opcode, only used in debug mode
+    self.tracers = [None] * len(OPCODES)
+    for op in ['+', '-', '/', '*', '%', '==', '!=', '<', '<=', '>', '>=', '&', '|']:
+      self.tracers[OPCODES[op]] = self.traceDualOp
+    self.tracers[OPCODES['=']] = self.traceAssign
+    self.tracers[OPCODES['$']] = self.traceDeterminant
+    self.tracers[OPCODES['!']] = self.traceTranspose
+    self.tracers[OPCODES['?']] = self.traceInverse
+    self.tracers[OPCODES['MAT']] = self.traceMat
+    self.tracers[OPCODES['·']] = self.traceDotProduct
+    self.tracers[OPCODES['MAT·']] = self.traceMat
+    self.tracers[OPCODES['GoTo']] = self.traceGoTo
+    self.tracers[OPCODES['GoToF']] = self.traceGoToF
+    self.tracers[OPCODES['PRINT']] = self.tracePrint
+    self.tracers[OPCODES['READ']] = self.traceRead
+    self.tracers[OPCODES['VERIFY']] = self.traceVerify
+    self.tracers[OPCODES['+->']] = self.traceBaseAddress
+    self.tracers[OPCODES['ERA']] = self.traceEra
+    self.tracers[OPCODES['PARAM']] = self.traceParam
+    self.tracers[OPCODES['GoSub']] = self.traceGoSub
+    self.tracers[OPCODES['RETURN']] = self.traceReturn
+    self.tracers[OPCODES['=>']] = self.traceAssignReturn
+    self.tracers[OPCODES['EndFunc']] = self.traceEndFunc
+    self.tracers[OPCODES['END']] = self.traceEnd
 
   # Debugger message
   def _debugMsg(self, quad, msg):
@@ -126,431 +224,540 @@ class HonkVM:
       else:
         print(f'{quad}:\t{msg}')
 
-  ## EXECUTION FUNCTIONS
-  # Get matrix iterator for batch processes when needed
-  def matIter(self):
-    return self.matHelper[0] * self.matHelper[1]
-
-  # Simple helper function to reset matHelper to 1,1
-  def resetMatHelper(self):
-    self.matHelper = (1, 1)
-
-  # Check if address is a pointer (using regex)
-  def isPointer(self, addr):
-    return re.match(r'\(\d+,\)', str(addr))
-
-  # Get type based on a memory range's address
-  def getTypeByRange(self, addr, memRange):
-    if self.isPointer(addr):
-      ptr = addr[1:-2]
-      self.getTypeByRange(self.getValue(ptr), memRange)
-    elif addr < memRange[1]:
-      return 'int'
-    elif addr < memRange[2]:
-      return 'float'
-    elif addr < memRange[3]:
-      return 'char'
-    else:
-      return 'bool'
-
-  # Get type by address
-  def getTypeByAddress(self, addr):
-    if self.isPointer(addr):
-      ptr = addr[1:-2]
-      return self.getTypeByAddress(self.getValue(ptr))
-
-    addr = int(addr)
-    if addr < self.globalRanges[0] or addr >= self.localRanges[4]:
-      raise Exception(f'Accessing prohibited memory! -> ({addr})')
-
-    if addr < self.globalRanges[1]:
-      return 'int'
-    elif addr < self.globalRanges[2]:
-      return 'float'
-    elif addr < self.globalRanges[3]:
-      return 'char'
-    elif addr < self.globalRanges[4]:
-      return 'bool'
-    elif addr < self.localRanges[1]:
-      return 'int'
-    elif addr < self.localRanges[2]:
-      return 'float'
-    elif addr < self.localRanges[3]:
-      return 'char'
-    elif addr < self.localRanges[4]:
-      return 'bool'
-
-    raise Exception(f'How did we get here?? -> ({addr})')
-
-  # Get index of memory for locals and temporary values
-  def getLocalIndex(self, addr, memRange, offsets):
-    i = -1
-    for r in memRange[:-1]:
-      if addr >= r:
-        ret = addr - r
-        i += 1
-      if addr < r:
-        break
-    return ret + offsets[i]
-
-  # Get a raw address
-  def getVar(self, addr, matOffset=0):
+  ## DECODING FUNCTIONS
+  # Decode a single operand of a quad
+  def _decodeOperand(self, operand):
+    if isinstance(operand, str) and operand[0] == '"':     # String literals lose their quotes
+      return operand[1:-1]
+    return operand
+
+  # Split an address operand into (address, isPointer) based on its pointer bit
+  def _splitPointer(self, operand):
+    if isinstance(operand, int) and operand & POINTER_BIT:
+      return operand & ~POINTER_BIT, True
+    return operand, False
+
+  # Decode a quad into (opcode, left, right, result, flags, dims, size, aux)
+  # NOTE: aux is the native function of dual-op quads and the frame template of ERA quads
+  def _decodeQuad(self, fields):
+    if fields[0] not in OPCODES:
+      raise Exception(f'Unknown operation! -> {fields}')
+
+    left = self._decodeOperand(fields[1])
+    right = self._decodeOperand(fields[2])
+    result = self._decodeOperand(fields[3])
+
+    # Only addresses may be pointers, other operands (like jumps) are left untouched
+    leftAddr, rightAddr, resultAddr = address_operands.get(fields[0], (False, False, False))
+    leftPtr = rightPtr = resultPtr = False
+    if leftAddr:
+      left, leftPtr = self._splitPointer(left)
+    if rightAddr:
+      right, rightPtr = self._splitPointer(right)
+    if resultAddr:
+      result, resultPtr = self._splitPointer(result)
+
+    flags = 0
+    if leftPtr:
+      flags |= PTR_LEFT
+    if rightPtr:
+      flags |= PTR_RIGHT
+    if resultPtr:
+      flags |= PTR_RESULT
+
+    op = OPCODES[fields[0]]
+    aux = None
+    if OPNAMES[op] in dual_funcs:
+      aux = self._getDualFunc(op, left, leftPtr, right, rightPtr)
+    elif op == OPCODES['+->']:    # Remember the type a pointer points to
+      self.ptrTypes[result] = self.memory.getType(right)
+    elif op == OPCODES['ERA']:
+      aux = self.eras[result]
+
+    # Resolve addresses into cells, so accessing memory doesn't need to search through ranges
+    if leftAddr:
+      left = self.memory.locate(left)
+    if rightAddr:
+      right = self.memory.locate(right)
+    if resultAddr and not isinstance(result, str):
+      result = self.memory.locate(result)
+
+    return (op, left, right, result, flags, None, 1, aux)
+
+  # Get the native function of a dual-op quad based on the types of its operands
+  def _getDualFunc(self, op, left, leftPtr, right, rightPtr):
+    left_type = self.ptrTypes[left] if leftPtr else self.memory.getType(left)
+    right_type = self.ptrTypes[right] if rightPtr else self.memory.getType(right)
+
     try:
-      if self.isPointer(addr):
-        ptr = addr[1:-2]
-        return self.getVar(self.getValue(ptr), matOffset)
-
-      addr = int(addr) + matOffset
-      if addr < self.globalRanges[0] or addr >= self.cteRanges[4]:
-        raise Exception(f'Getting from out of bounds! -> ({addr}{f" + {matOffset}" if matOffset else ""})')
-
-      if addr < self.globalRanges[4]:
-        return self.Globals[addr - self.globalRanges[0]]
-      elif addr < self.localRanges[4]:
-        rangeAddr = None
-        if len(self.Locals) == 1:
-          rangeAddr = addr - self.localRanges[0]
-        else:
-          rangeAddr = self.getLocalIndex(addr, self.localRanges, self.LocalOffsets[-1])
-        return self.Locals[-1][rangeAddr]
-      elif addr < self.tempRanges[4]:
-        rangeAddr = None
-        if len(self.Temps) == 1:
-          rangeAddr = addr - self.tempRanges[0]
-        else:
-          rangeAddr = self.getLocalIndex(addr, self.tempRanges, self.TempOffsets[-1])
-        return self.Temps[-1][rangeAddr]
+      return dual_dispatch[(op, left_type, right_type)]
+    except KeyError:
+      raise Exception(f'Type mismatch! {left_type} {OPNAMES[op]} {right_type}')
+
+  # Hand the dimensions of every MAT quad over to the quad that follows it
+  # NOTE: Batch dual-op quads swap their native function for its vectorized counterpart
+  def _attachMatDims(self):
+    for i, quad in enumerate(self.quads[:-1]):
+      if quad[0] == OPCODES['MAT']:
+        dims = (quad[1], quad[2])
+        size = quad[1] * quad[2]
+      elif quad[0] == OPCODES['MAT·']:
+        dims = (quad[1], quad[2], quad[3])
+        size = quad[1] * quad[3]
       else:
-        return self.Ctes[addr - self.cteRanges[0]]
-    except:
-      raise Exception(f'Var is not assigned in memory?! -> ({addr}{f" + {matOffset}" if matOffset else ""})')
+        continue
 
-  # Get a value from an address
-  def getValue(self, addr, matOffset=0):
-    try:
-      return self.getVar(addr, matOffset).getActualValue()
-    except AttributeError:
-      raise AttributeError(f'Var is not assigned in memory?! -> ({addr}{f" + {matOffset}" if matOffset else ""})')
+      target = self.quads[i + 1]
+      aux = target[7]
+      if aux in vector_funcs and size > 1:
+        aux = vector_funcs[aux]
+      self.quads[i + 1] = target[:5] + (dims, size, aux)
+
+  ## EXECUTION FUNCTIONS
+  # Replace pointer operands of a quad with the cells they point to
+  def derefQuad(self, quad):
+    op, left, right, result, flags, dims, size, aux = quad
+    if flags & PTR_LEFT:
+      left = self.memory.locate(self.getValue(left))
+    if flags & PTR_RIGHT:
+      right = self.memory.locate(self.getValue(right))
+    if flags & PTR_RESULT:
+      result = self.memory.locate(self.getValue(result))
+    return (op, left, right, result, 0, dims, size, aux)
+
+  # Get the address of a cell (for debugging messages)
+  def _addr(self, cell):
+    return self.memory.getAddress(cell)
+
+  # Get type by cell (only variables are allowed)
+  def getTypeByCell(self, cell):
+    if cell[0] >= 8:
+      raise Exception(f'Accessing prohibited memory! -> ({self._addr(cell)})')
+
+    return self.memory.getCellType(cell)
+
+  # Get a value from a cell
+  def getValue(self, cell, matOffset=0):
+    return self.memory.getValue(cell, matOffset)
 
   # Set a value and save it in memory
-  def setValue(self, value, addr, matOffset=0):
-    if self.isPointer(addr):
-      ptr = addr[1:-2]
-      self.setValue(value, self.getValue(ptr, matOffset))
-    else:
-      addr = int(addr) + matOffset
-      if addr < self.globalRanges[0] or addr >= self.tempRanges[4]:
-        return Exception(f'Setting in invalid memory! -> ({addr}{f" + {matOffset}" if matOffset else ""})')
-
-      elif addr < self.globalRanges[4]:
-        rangeAddr = addr - self.globalRanges[0]
-        self.Globals[rangeAddr] = Var(value, self.getTypeByRange(addr, self.globalRanges))
-      elif addr < self.localRanges[4]:
-        rangeAddr = None
-        if len(self.Locals) == 1:
-          rangeAddr = addr - self.localRanges[0]
-        else:
-          rangeAddr = self.getLocalIndex(addr, self.localRanges, self.LocalOffsets[-1])
-        self.Locals[-1][rangeAddr] = Var(value, self.getTypeByRange(addr, self.localRanges))
-      elif addr < self.tempRanges[4]:
-        rangeAddr = None
-        if len(self.Temps) == 1:
-          rangeAddr = addr - self.tempRanges[0]
-        else:
-          rangeAddr = self.getLocalIndex(addr, self.tempRanges, self.TempOffsets[-1])
-        self.Temps[-1][rangeAddr] = Var(value, self.getTypeByRange(addr, self.tempRanges))
-      else:
-        rangeAddr = addr - self.cteRanges[0]
-        self.Ctes[rangeAddr] = Var(value, self.getTypeByRange(addr, self.cteRanges))
+  def setValue(self, value, cell, matOffset=0):
+    self.memory.setValue(value, cell, matOffset)
 
   # Reconstruct a matrix for matrix operations
-  def constructMatrix(self, addr, offset=0):
-    rows = self.matHelper[0 + offset]
-    cols = self.matHelper[1 + offset]
-
-    ret = []
-    for i in range(rows):
-      tmp = []
-      for j in range(cols):
-        tmp.append(self.getValue(addr, (i * cols) + j))
-      ret.append(tmp)
-    return ret
+  # NOTE: The matrix is a view over memory, so nothing is copied to build it
+  def constructMatrix(self, cell, dims, offset=0):
+    rows = dims[0 + offset]
+    cols = dims[1 + offset]
+    return self.memory.getView(cell, rows * cols).reshape(rows, cols)
 
-  # Allocate memory for function call
-  def prepareERA(self, func):
-    eraVals = self.eras[func]
-    self.localAux = [None] * sum(eraVals[0])
-    localEra = [0]
-    for e in eraVals[0][:-1]:
-      localEra.append(localEra[-1] + e)
-    self.LocalOffsets.append(localEra)
-
-    self.tempAux = [None] * sum(eraVals[1])
-    tempEra = [0]
-    for e in eraVals[1][:-1]:
-      tempEra.append(tempEra[-1] + e)
-    self.TempOffsets.append(tempEra)
+  # Store a whole matrix starting at a cell in one go
+  def storeMatrix(self, mat, cell):
+    self.memory.setValues(mat.reshape(-1), cell, mat.size)
 
+  # Allocate memory for function call
+  # NOTE: Frames wait in a stack, since a call's params may hold calls of their own
+  def prepareERA(self, template):
+    self.sFrames.append(self.memory.createFrame(template))
     self.sParams.append([])
 
   # Pop out of function and return state as previously saved
   def popOutOfFunction(self):
-    self.Locals.pop()
-    self.Temps.pop()
-    self.LocalOffsets.pop()
-    self.TempOffsets.pop()
+    self.memory.popFrame()
     return self.sCalls.pop()
 
+  ## QUAD HANDLERS
+  # NOTE: Every handler receives the current ip and its decoded quad, and returns the next ip.
+  # Handlers don't trace anything, the debug loop runs each quad's tracer right before it instead.
+  # Dual-op operation - Batch-compatible
+  def execDualOp(self, ip, quad):
+    size = quad[6]
+    if size == 1:
+      self.setValue(quad[7](self.getValue(quad[1]), self.getValue(quad[2])), quad[3])
+    else:     # Batches run as a single operation over whole blocks of memory
+      left = self.memory.getView(quad[1], size)
+      right = self.memory.getView(quad[2], size)
+      self.memory.setValues(quad[7](left, right), quad[3], size)
+    return ip + 1
+
+  # Assignment - Batch-compatible
+  def execAssign(self, ip, quad):
+    size = quad[6]
+    if size == 1:
+      self.setValue(self.getValue(quad[1]), quad[3])
+    else:     # Batches are copied as a single block
+      self.memory.setValues(self.memory.getView(quad[1], size), quad[3], size)
+    return ip + 1
+
+  # Matrix Determinant
+  def execDeterminant(self, ip, quad):
+    mat = self.constructMatrix(quad[1], quad[5])
+    self.setValue(np.linalg.det(mat), quad[3])
+    return ip + 1
+
+  # Matrix Transpose
+  def execTranspose(self, ip, quad):
+    mat = self.constructMatrix(quad[1], quad[5])
+    self.storeMatrix(mat.T, quad[3])
+    return ip + 1
+
+  # Matrix Inversion
+  def execInverse(self, ip, quad):
+    mat = self.constructMatrix(quad[1], quad[5])
+    try:
+      inv = np.linalg.inv(mat)
+    except np.linalg.LinAlgError:
+      raise Exception(f'This matrix can\'t be inverted! -> ({self._addr(quad[1])})')
+
+    self.storeMatrix(inv, quad[3])
+    return ip + 1
+
+  # Matrix helpers (MAT, MAT·)
+  # NOTE: Their dimensions are already attached to the following quad when decoding
+  def execMat(self, ip, quad):
+    return ip + 1
+
+  # Dot product
+  def execDotProduct(self, ip, quad):
+    left = self.constructMatrix(quad[1], quad[5])
+    right = self.constructMatrix(quad[2], quad[5], 1)
+    self.storeMatrix(_vecDot(left, right), quad[3])
+    return ip + 1
+
+  # Go to #
+  def execGoTo(self, ip, quad):
+    return quad[3]
+
+  # Go to # if false - Batch-compatible
+  def execGoToF(self, ip, quad):
+    if self.checkCondition(quad):
+      return ip + 1
+    return quad[3]
+
+  # Print - Batch-compatible
+  def execPrint(self, ip, quad):
+    operand = quad[3]
+    if isinstance(operand, str):
+      print(operand)
+    elif quad[6] == 1:
+      value = self.getValue(operand)
+      if self.memory.getCellType(operand) == 'bool':   # Bools are stored as 0/1
+        value = bool(value)
+      print(str(value))
+    else:
+      mat = self.constructMatrix(operand, quad[5]).tolist()
+      cellType = self.memory.getCellType(operand)
+      if cellType == 'bool':
+        mat = [[bool(value) for value in row] for row in mat]
+      elif cellType == 'char':    # Chars are viewed as their code points
+        mat = [[chr(value) for value in row] for row in mat]
+
+      if len(mat) == 1:
+        print(mat[-1])
+      else:
+        print(mat)
+    return ip + 1
+
+  # Read input - Batch-compatible
+  # NOTE: Traces from here since they go in between prompts, reading input outweighs the check anyway
+  def execRead(self, ip, quad):
+    cell = quad[3]
+    input_type = self.getTypeByCell(cell)
+    for i in range(quad[6]):
+      if self.debug:
+        self._debugMsg(ip, f'Requesting input for ({self._addr(cell)}{f" + {i}" if i else ""}), type: {input_type}...')
+
+      # Repeat asking for input until correct
+      while True:
+        user_input = input("> ")
+        try:
+          value = None
+          if input_type == 'int':
+            value = int(user_input)
+          elif input_type == 'float':
+            value = float(user_input)
+          elif input_type == 'bool':
+            if value == 'True':
+              value = True
+            elif value == 'False':
+              value = False
+            else:
+              raise Exception("Invalid type!")
+          elif input_type == 'char':
+            value = user_input[0]
+        except:
+          print('! Invalid type! Try again...')
+          continue
+        else:
+          self.setValue(value, cell, i)
+          break
+    return ip + 1
+
+  # Verify matrix access dimension
+  def execVerify(self, ip, quad):
+    index = self.getValue(quad[1])
+    if index < 0 or index >= quad[3]:
+      raise Exception(f'{index} is out of bounds of range 0-{quad[3] - 1}')
+    return ip + 1
+
+  # Add a variable's base address to produce a pointer
+  def execBaseAddress(self, ip, quad):
+    self.setValue(self.getValue(quad[1]) + quad[2], quad[3])
+    return ip + 1
+
+  # ERA Preparation
+  def execEra(self, ip, quad):
+    self.prepareERA(quad[7])
+    return ip + 1
+
+  # Send parameter to function call - Batch-compatible
+  def execParam(self, ip, quad):
+    size = quad[6]
+    if size == 1:
+      param = self.getValue(quad[1])
+    else:
+      param = self.memory.getValues(quad[1], size)
+    self.sParams[-1].append((param, quad[2], size))
+    return ip + 1
+
+  # Go to function
+  def execGoSub(self, ip, quad):
+    self.sCalls.append(ip)
+    self.memory.pushFrame(self.sFrames.pop())
+
+    params = self.sParams.pop()
+    for param, cell, size in params:
+      if size == 1:
+        self.setValue(param, cell)
+      else:
+        self.memory.setValues(param, cell, size)
+    return quad[3]
+
+  # Pop back to original function after RETURN - Batch-compatible
+  def execReturn(self, ip, quad):
+    if quad[6] == 1:
+      self.sReturns.append(self.getValue(quad[3]))
+    else:
+      self.sReturns.append(self.memory.getValues(quad[3], quad[6]))
+    return self.popOutOfFunction() + 1
+
+  # Special quad to complete RETURN functionality - Batch-compatible
+  def execAssignReturn(self, ip, quad):
+    ret = self.sReturns.pop()
+    if quad[6] == 1:
+      self.setValue(ret, quad[3])
+    else:
+      self.memory.setValues(ret, quad[3], quad[6])
+    return ip + 1
+
+  # Pop back to original function after end of function
+  def execEndFunc(self, ip, quad):
+    return self.popOutOfFunction() + 1
+
+  # Program End
+  def execEnd(self, ip, quad):
+    return None
+
+  # Check the condition of a GoToF
+  # NOTE: If array/matrix, functions like an AND gate
+  def checkCondition(self, quad):
+    if quad[6] == 1:
+      return self.getValue(quad[1])
+    return self.memory.getView(quad[1], quad[6]).all()
+
+  ## QUAD TRACERS
+  # NOTE: Tracers print what a quad is about to do, and only run in debug mode (-v).
+  # They run before their handler, so they never see memory the handler already changed.
+  # Format an element's address within a batch
+  def _elemAddr(self, cell, i):
+    return f'{self._addr(cell)}{f" + {i}" if i else ""}'
+
+  # Dual-op operation
+  def traceDualOp(self, ip, quad):
+    size = quad[6]
+    if size == 1:
+      left = [self.getValue(quad[1])]
+      right = [self.getValue(quad[2])]
+      result = [quad[7](left[0], right[0])]
+    else:
+      leftView = self.memory.getView(quad[1], size)
+      rightView = self.memory.getView(quad[2], size)
+      left, right = leftView.tolist(), rightView.tolist()
+      result = quad[7](leftView, rightView).tolist()
+
+    for i in range(size):
+      self._debugMsg(ip, f'{left[i]} {OPNAMES[quad[0]]} {right[i]} = {result[i]} -> ({self._elemAddr(quad[3], i)})')
+
+  # Assignment
+  def traceAssign(self, ip, quad):
+    for i in range(quad[6]):
+      self._debugMsg(ip, f'{self.getValue(quad[1], i)} -> ({self._elemAddr(quad[3], i)})')
+
+  # Matrix Determinant
+  def traceDeterminant(self, ip, quad):
+    self._debugMsg(ip, f'Stored determinant value -> ({self._addr(quad[3])})')
+
+  # Matrix Transpose
+  def traceTranspose(self, ip, quad):
+    self._debugMsg(ip, f'Transposed matrix -> ({self._addr(quad[3])} - {self._addr(quad[3]) + quad[6] - 1})')
+
+  # Matrix Inversion
+  def traceInverse(self, ip, quad):
+    self._debugMsg(ip, f'Inverted matrix -> ({self._addr(quad[3])} - {self._addr(quad[3]) + quad[6] - 1})')
+
+  # Matrix helpers (MAT, MAT·)
+  def traceMat(self, ip, quad):
+    if quad[0] == OPCODES['MAT']:
+      self._debugMsg(ip, f'Preparing for matrix of size [{quad[1]}][{quad[2]}]')
+    else:
+      self._debugMsg(ip, f'Preparing for dot product {quad[1]}x{quad[2]} · {quad[2]}x{quad[3]}')
+
+  # Dot product
+  def traceDotProduct(self, ip, quad):
+    self._debugMsg(ip, f'Dot product -> ({self._addr(quad[3])} - {self._addr(quad[3]) + quad[6] - 1})')
+
+  # Go to #
+  def traceGoTo(self, ip, quad):
+    self._debugMsg(ip, f'Jump -> {quad[3]}')
+
+  # Go to # if false
+  def traceGoToF(self, ip, quad):
+    if self.checkCondition(quad):
+      self._debugMsg(ip, f'Denied jump because true')
+    else:
+      self._debugMsg(ip, f'Allowed jump -> {quad[3]}')
+
+  # Print
+  def tracePrint(self, ip, quad):
+    operand = quad[3]
+    if isinstance(operand, str):
+      self._debugMsg(ip, f'Printing string: {operand}')
+    elif quad[6] == 1:
+      value = self.getValue(operand)
+      if self.memory.getCellType(operand) == 'bool':
+        value = bool(value)
+      self._debugMsg(ip, f'Printing value: ({self._addr(operand)}) -> {value}')
+    else:
+      self._debugMsg(ip, f'Printing array/matrix: ({self._addr(operand)} - {self._addr(operand) + quad[6] - 1})')
+
+  # Read input (traced by its own handler)
+  def traceRead(self, ip, quad):
+    pass
+
+  # Verify matrix access dimension
+  def traceVerify(self, ip, quad):
+    self._debugMsg(ip, f'Verifying that {self.getValue(quad[1])} < {quad[3]}...')
+
+  # Add a variable's base address to produce a pointer
+  def traceBaseAddress(self, ip, quad):
+    self._debugMsg(ip, f'Creating pointer {self.getValue(quad[1])} + {quad[2]} -> (({self._addr(quad[3])}))')
+
+  # ERA Preparation
+  def traceEra(self, ip, quad):
+    self._debugMsg(ip, f'Preparing ERA for function -> {quad[3]}')
+
+  # Send parameter to function call
+  def traceParam(self, ip, quad):
+    for i in range(quad[6]):
+      self._debugMsg(ip, f'Assigning value from ({self._elemAddr(quad[1], i)}) as parameter #{quad[3]}')
+
+  # Go to function
+  def traceGoSub(self, ip, quad):
+    self._debugMsg(ip, f'Jump to function: {ip} -> {quad[3]}')
+
+  # Pop back to original function after RETURN
+  def traceReturn(self, ip, quad):
+    for i in range(quad[6]):
+      self._debugMsg(ip, f'Return found! Assigning value -> ({self._elemAddr(quad[3], i)})')
+    self._debugMsg(ip, f'Popping back! {ip} -> {self.sCalls[-1] + 1}')
+
+  # Special quad to complete RETURN functionality
+  def traceAssignReturn(self, ip, quad):
+    ret = self.sReturns[-1]
+    values = [ret] if quad[6] == 1 else ret.tolist()
+    for i, value in enumerate(values):
+      self._debugMsg(ip, f'Assigned return value of {value} to address ({self._elemAddr(quad[3], i)})')
+
+  # Pop back to original function after end of function
+  def traceEndFunc(self, ip, quad):
+    self._debugMsg(ip, f'End of function found! Popping back! {ip} -> {self.sCalls[-1] + 1}')
+
+  # Program End
+  def traceEnd(self, ip, quad):
+    self._debugMsg(ip, 'HONK! (BYE!)')
+
   # Execute virtual machine
+  # NOTE: The loop is picked once, so runs without -v or --profile don't pay for tracing or timing at all
   def execute(self):
-    ip = 0
+    if self.callProfile:
+      self.callProfile.start()
 
-    while True:
-      quad = self.quads[ip]
-      op = quad[0]
-
-      ## - Let it begin. The super-switch case
-      # Dual-op operation - Batch-compatible
-      if op in ['+', '-', '/', '*', '%', '==', '!=', '<', '<=', '>', '>=', '&', '|']:
-        for i in range(self.matIter()):
-          left = self.getValue(quad[1], i)
-          right = self.getValue(quad[2], i)
-
-          result = None
-          if op == '&':
-            result = eval(f'{left} and {right}')
-          elif op == '|':
-            result = eval(f'{left} or {right}')
-          else:
-            result = eval(f'{left} {op} {right}')
-
-          self.setValue(result, quad[3], i)
-          self._debugMsg(ip, f'{left} {op} {right} = {result} -> ({quad[3]}{f" + {i}" if i else ""})')
-
-      # Assignment - Batch-compatible
-      elif op == '=':
-        for i in range(self.matIter()):
-          value = self.getValue(quad[1], i)
-          self.setValue(value, quad[3], i)
-          self._debugMsg(ip, f'{value} -> ({quad[3]}{f" + {i}" if i else ""})')
-
-      # Matrix Determinant
-      elif op == '$':
-        mat = self.constructMatrix(quad[1])
-        det = np.linalg.det(np.array(mat))
-        self.setValue(det, quad[3])
-        self._debugMsg(ip, f'Stored determinant value -> ({quad[3]})')
-
-      # Matrix Transpose
-      elif op == '!':
-        mat = self.constructMatrix(quad[1])
-        trans = np.array(mat).transpose().tolist()
-        flat = [leaf for tree in trans for leaf in tree]
-
-        for i in range(len(flat)):
-          self.setValue(flat[i], quad[3], i)
-
-        self._debugMsg(ip, f'Transposed matrix -> ({quad[3]} - {int(quad[3]) + len(flat) - 1})')
-
-      # Matrix Inversion
-      elif op == '?':
-        mat = self.constructMatrix(quad[1])
-        try:
-          inv = np.linalg.inv(np.array(mat))
-          flat = [leaf for tree in inv for leaf in tree]
-
-          for i in range(len(flat)):
-            self.setValue(flat[i], quad[3], i)
+    if self.debug:
+      self.executeDebug()
+    elif self.profile:
+      self.executeProfile()
+    else:
+      self.executeLean()
 
-          self._debugMsg(ip, f'Inverted matrix -> ({quad[3]} - {int(quad[3]) + len(flat) - 1})')
-        except:
-          raise Exception(f'This matrix can\'t be inverted! -> ({quad[1]})')
-
-      # Matrix helper
-      elif op == 'MAT':
-        rows = int(quad[1])
-        cols = int(quad[2])
-        self.matHelper = (rows, cols)
-
-        self._debugMsg(ip, f'Preparing for matrix of size [{rows}][{cols}]')
-
-      # Dot product
-      elif op == '·':
-        left = self.constructMatrix(quad[1])
-        right = self.constructMatrix(quad[2], 1)
-        dot = np.dot(np.array(left), np.array(right)).tolist()
-        flat = [leaf for tree in dot for leaf in tree]
-
-        for i in range(len(flat)):
-          self.setValue(flat[i], quad[3], i)
-
-        self._debugMsg(ip, f'Dot product -> ({quad[3]} - {int(quad[3]) + len(flat) - 1})')
-
-      # Matrix helper specialized for dot products
-      elif op == 'MAT·':
-        m = int(quad[1])
-        n = int(quad[2])
-        p = int(quad[3])
-        self.matHelper = (m, n, p)
-
-        if self.debug:
-          self._debugMsg(ip, f'Preparing for dot product {m}x{n} · {n}x{p}')
-
-      # Go to #
-      elif op == 'GoTo':
-        self._debugMsg(ip, f'Jump -> {quad[3]}')
-        ip = int(quad[3])
-        continue
+    if self.callProfile:
+      self.callProfile.finish()
 
-      # Go to # if false - Batch-compatible
-      elif op == 'GoToF':
-        boolean = True
-        # If array/matrix, functions like an AND gate
-        for i in range(self.matIter()):
-          if not self.getValue(quad[1], i):
-            boolean = False
-            break
-
-        if boolean:
-          self._debugMsg(ip, f'Denied jump because true')
-        else:
-          self._debugMsg(ip, f'Allowed jump -> {quad[3]}')
-          ip = int(quad[3])
-          continue
+  # Execution loop without any tracing
+  def executeLean(self):
+    quads = self.quads
+    handlers = self.handlers
+    ip = 0
 
-      # Print - Batch-compatible
-      elif op == 'PRINT':
-        operand = quad[3]
-        if re.match(r'\".*\"', operand):
-          string = operand[1:-1]
-          self._debugMsg(ip, f'Printing string: {string}')
-          print(string)
-        else:
-          count = self.matIter()
-          if count == 1:
-            self._debugMsg(ip, f'Printing value: ({operand}) -> {value}')
-            value = self.getValue(operand)
-            print(str(value))
-          else:
-            self._debugMsg(ip, f'Printing array/matrix: ({operand} - {int(operand) + count - 1})')
-            mat = self.constructMatrix(operand)
-
-            if len(mat) == 1:
-              print(mat[-1])
-            else:
-              print(mat)
-
-      # Read input - Batch-compatible
-      elif op == 'READ':
-        addr = quad[3]
-        input_type = self.getTypeByAddress(addr)
-        for i in range(self.matIter()):
-          self._debugMsg(ip, f'Requesting input for ({addr}{f" + {i}" if i else ""}), type: {input_type}...')
-
-          # Repeat asking for input until correct
-          while True:
-            user_input = input("> ")
-            try:
-              value = None
-              if input_type == 'int':
-                value = int(user_input)
-              elif input_type == 'float':
-                value = float(user_input)
-              elif input_type == 'bool':
-                if value == 'True':
-                  value = True
-                elif value == 'False':
-                  value = False
-                else:
-                  raise Exception("Invalid type!")
-              elif input_type == 'char':
-                value = user_input[0]
-            except:
-              print('! Invalid type! Try again...')
-              continue
-            else:
-              self.setValue(value, addr, i)
-              break
-
-
-      # Verify matrix access dimension
-      elif op == 'VERIFY':
-        index = self.getValue(quad[1])
-        limit = int(quad[3])
-        self._debugMsg(ip, f'Verifying that {index} < {limit}...')
-
-        if index < 0 or index >= limit:
-          raise Exception(f'{index} is out of bounds of range 0-{limit - 1}')
-
-      # Add a variable's base address to produce a pointer
-      elif op == '+->':
-        offset = self.getValue(quad[1])
-        base = int(quad[2])
-        self._debugMsg(ip, f'Creating pointer {offset} + {base} -> (({quad[3]}))')
-        self.setValue(offset + base, quad[3])
-
-      # ERA Preparation
-      elif op == 'ERA':
-        self.prepareERA(quad[3])
-        self._debugMsg(ip, f'Preparing ERA for function -> {quad[3]}')
-
-      # Send parameter to function call - Batch-compatible
-      elif op == 'PARAM':
-        for i in range(self.matIter()):
-          param = self.getValue(quad[1], i)
-          self.sParams[-1].append((param, quad[2], i))
-          self._debugMsg(ip, f'Assigning value from ({quad[1]}{f" + {i}" if i else ""}) as parameter #{quad[3]}')
-
-      # Go to function
-      elif op == 'GoSub':
-        self.sCalls.append(ip)
-        self.Locals.append(self.localAux)
-        self.Temps.append(self.tempAux)
-
-        params = self.sParams.pop()
-        for p in params:
-          self.setValue(p[0], p[1], p[2])
-
-        ip = int(quad[3])
-        self._debugMsg(self.sCalls[-1], f'Jump to function: {self.sCalls[-1]} -> {ip}')
-        continue
+    while ip is not None:
+      quad = quads[ip]
+      if quad[4]:
+        quad = self.derefQuad(quad)
+      ip = handlers[quad[0]](ip, quad)
+
+  # Execution loop tracing every quad before running it
+  def executeDebug(self):
+    quads = self.quads
+    handlers = self.handlers
+    tracers = self.tracers
+    ip = 0
 
-      # Pop back to original function after RETURN - Batch-compatible
-      elif op == 'RETURN':
-        ret = []
-        for i in range(self.matIter()):
-          self._debugMsg(ip, f'Return found! Assigning value -> ({quad[3]}{f" + {i}" if i else ""})')
-          ret.append(self.getValue(quad[3], i))
-        self.sReturns.append(ret)
-        self._debugMsg(ip, f'Popping back! {ip} -> {self.sCalls[-1] + 1}')
-        ip = self.popOutOfFunction()
-
-      # Special quad to complete RETURN functionality - Batch-compatible
-      elif op == '=>':
-        ret = self.sReturns.pop()
-        for i in range(len(ret)):
-          self.setValue(ret[i], quad[3], i)
-          self._debugMsg(ip, f'Assigned return value of {value} to address ({quad[3]}{f" + {i}" if i else ""})')
-
-      # Pop back to original function after end of function
-      elif op == 'EndFunc':
-        self._debugMsg(ip, f'End of function found! Popping back! {ip} -> {self.sCalls[-1] + 1}')
-        ip = self.popOutOfFunction()
-
-      # Program End
-      elif op == 'END':
-        self._debugMsg(ip, 'HONK! (BYE!)')
-        break
-      else:
-        self._debugMsg(ip, f'! -> {quad}')
+    while ip is not None:
+      quad = quads[ip]
+      if quad[4]:
+        quad = self.derefQuad(quad)
+      tracers[quad[0]](ip, quad)
+      ip = handlers[quad[0]](ip, quad)
+
+  # Execution loop counting and timing every quad
+  # NOTE: A call's time goes to the quads of the function called, GoSub only gets the jump itself
+  def executeProfile(self):
+    quads = self.quads
+    handlers = self.handlers
+    counts = self.profile.counts
+    times = self.profile.times
+    ip = 0
 
-      ip += 1
-      if op not in ['MAT', 'MAT·']:
-        self.resetMatHelper()
+    while ip is not None:
+      start = perf_counter_ns()
+      quad = quads[ip]
+      if quad[4]:
+        quad = self.derefQuad(quad)
+      nextIp = handlers[quad[0]](ip, quad)
+      times[ip] += perf_counter_ns() - start
+      counts[ip] += 1
+      ip = nextIp
 
 # # # # # # # # # # # # # # # # # # # # # # #
 # # # # HECKING HONK LIKE NO TOMORROW # # # #
 # # # # # # # # # # # # # # # # # # # # # # #
-def honk(obj, debug=False):
-  vm = HonkVM(obj, debug)
+# NOTE: Takes either a program from QuadManager.getProgram() / readObj(), or the contents of a .o file.
+# Returns the VM, so whoever ran it can look at its profiles
+def honk(program, debug=False, profile=False, callProfile=False):
+  if isinstance(program, str):
+    program = parseObj(program)
+  elif isinstance(program, (bytes, bytearray, memoryview)):
+    program = BinaryProgram(program) if isBinaryObj(program) else parseObj(bytes(program).decode())
+
+  vm = HonkVM(program, debug, profile, callProfile)
   vm.execute()
+  return vm
@@ -0,0 +1,283 @@
+import mmap
+import struct
+from collections import deque
+
+# .o files hold a program in one of two formats, both with the same sections:
+# ranges, constants, ERAs (every function but main), quads and the source line of every quad
+# - Binary (the default): fixed-width records the VM maps into memory and decodes as it reads them
+# - Text: one tab-separated line per record, kept around for debugging
+
+## BINARY FORMAT
+# Header: magic, version, and the number of constants, ERAs, quads and strings
+# NOTE: Every section comes right after the previous one, in the order listed above,
+# followed by the string table (quad operators, string literals and function names)
+OBJ_MAGIC = b'HONK'
+OBJ_VERSION = 2
+header_struct = struct.Struct('<4sHxxIIII')
+
+# Ranges: 4 rows of 5 addresses
+ranges_struct = struct.Struct('<20i')
+
+# Constant: type, address and 8 bytes holding the value
+cte_struct = struct.Struct('<B3xI8s')
+
+# ERA: function name (index in the string table), then 4 local and 4 temp counts
+era_struct = struct.Struct('<I8I')
+
+# Quad: source line, operator (index in the string table), the kind of each field (2 bits each) and the fields themselves
+quad_struct = struct.Struct('<IHBxqqq')
+
+# String table entry: length, followed by that many bytes of UTF-8
+strlen_struct = struct.Struct('<I')
+
+# Kinds of quad fields
+FIELD_NONE, FIELD_INT, FIELD_STR = range(3)
+
+# Constant types, in the same order as the memory's buffers, and how their value is packed
+cte_types = ('int', 'float', 'char', 'bool')
+cte_packers = {
+  'int': lambda value: struct.pack('<q', value),
+  'float': lambda value: struct.pack('<d', value),
+  'char': lambda value: struct.pack('<q', ord(value)),
+  'bool': lambda value: struct.pack('<q', int(value))
+}
+cte_unpackers = (
+  lambda raw: struct.unpack('<q', raw)[0],
+  lambda raw: struct.unpack('<d', raw)[0],
+  lambda raw: chr(struct.unpack('<q', raw)[0]),
+  lambda raw: bool(struct.unpack('<q', raw)[0])
+)
+
+## WRITING
+# Write a program into a .o file
+def writeObj(program, filename):
+  with open(filename, 'w') as f:
+    # Write ranges
+    f.write('-> RANGES START\n')
+    for r in program['ranges']:
+      f.write(f'{r[0]}\t{r[1]}\t{r[2]}\t{r[3]}\t{r[4]}\n')
+    f.write('->| RANGES END\n')
+    # Write constants
+    f.write('-> CTES START\n')
+    for value, vartype, vAddr in program['ctes']:
+      f.write(f'{value}\t{vartype}\t{vAddr}\n')
+    f.write('->| CTES END\n')
+    # Write ERAs
+    f.write('-> ERAS START\n')
+    for func, localCounts, tempCounts in program['eras']:
+      localCounts = '\t'.join([str(x) for x in localCounts])
+      tempCounts = '\t'.join([str(x) for x in tempCounts])
+      f.write(f'{func}\t{localCounts}\t{tempCounts}\n')
+    f.write('->| ERAS END\n')
+    # Write quads
+    f.write('-> QUADS START\n')
+    for q in program['quads']:
+      f.write(f'{q[0]}\t{q[1]}\t{q[2]}\t{q[3]}\n')
+    f.write('->| QUADS END\n')
+    # Write lines
+    f.write('-> LINES START\n')
+    for line in program['lines']:
+      f.write(f'{line}\n')
+    f.write('->| LINES END\n')
+
+# Write a program into a binary .o file
+def writeBinaryObj(program, filename):
+  strings = dict()
+
+  # Get a string's index in the string table, adding it if it isn't there yet
+  def intern(string):
+    if string not in strings:
+      strings[string] = len(strings)
+    return strings[string]
+
+  # Get the kind and packed value of a quad field
+  def packField(field):
+    if field is None:
+      return FIELD_NONE, 0
+    elif isinstance(field, str):
+      return FIELD_STR, intern(field)
+    return FIELD_INT, field
+
+  ranges = [addr for r in program['ranges'] for addr in r]
+  ctes = [cte_struct.pack(cte_types.index(vartype), vAddr, cte_packers[vartype](value)) for value, vartype, vAddr in program['ctes']]
+  eras = [era_struct.pack(intern(func), *localCounts, *tempCounts) for func, localCounts, tempCounts in program['eras']]
+
+  quads = []
+  for (op, left, right, result), line in zip(program['quads'], program['lines']):
+    (leftKind, left), (rightKind, right), (resultKind, result) = packField(left), packField(right), packField(result)
+    quads.append(quad_struct.pack(line, intern(op), leftKind | rightKind << 2 | resultKind << 4, left, right, result))
+
+  table = []
+  for string in strings:    # Dicts keep their insertion order, which is also each string's index
+    data = string.encode()
+    table.append(strlen_struct.pack(len(data)) + data)
+
+  with open(filename, 'wb') as f:
+    f.write(header_struct.pack(OBJ_MAGIC, OBJ_VERSION, len(ctes), len(eras), len(quads), len(strings)))
+    f.write(ranges_struct.pack(*ranges))
+    f.write(b''.join(ctes))
+    f.write(b''.join(eras))
+    f.write(b''.join(quads))
+    f.write(b''.join(table))
+
+## READING
+# Object file error
+def _ded():
+  raise Exception('quack has commit die')
+
+# Covert array of strings into ints
+def _stringsToNumbers(arr):
+  return [int(i) for i in arr]
+
+# Convert a constant's text into its actual value
+def _parseCte(value, vartype):
+  if vartype == 'int':
+    return int(value)
+  elif vartype == 'float':
+    return float(value)
+  elif vartype == 'bool':
+    return value == 'True'
+  return value
+
+# Convert a quad field's text into its actual value
+def _parseField(field):
+  if field == 'None':
+    return None
+
+  try:
+    return int(field)
+  except ValueError:        # Strings and function names (ERA) stay as they are
+    return field
+
+# Get the lines of a section, checking its start and end markers
+def _readSection(lines, name):
+  if lines.popleft() != f'-> {name} START':
+    _ded()
+
+  section = []
+  while True:
+    line = lines.popleft()
+
+    if line == f'->| {name} END':
+      return section
+
+    section.append(line.split('\t'))
+
+# Read the text of a .o file into a program
+def parseObj(obj):
+  lines = deque(obj.split('\n'))
+  program = dict()
+  program['ranges'] = [tuple(_stringsToNumbers(r)) for r in _readSection(lines, 'RANGES')]
+  program['ctes'] = [(_parseCte(value, vartype), vartype, int(vAddr)) for value, vartype, vAddr in _readSection(lines, 'CTES')]
+  program['eras'] = [(data[0], _stringsToNumbers(data[1:5]), _stringsToNumbers(data[5:9])) for data in _readSection(lines, 'ERAS')]
+  program['quads'] = [tuple(_parseField(f) for f in fields) for fields in _readSection(lines, 'QUADS')]
+  program['lines'] = [int(line[0]) for line in _readSection(lines, 'LINES')]
+  return program
+
+# Program backed by the bytes of a binary .o file, decoding each section the first time it's asked for
+# NOTE: Behaves like the dict from parseObj() as far as the VM is concerned
+class BinaryProgram:
+  def __init__(self, buffer):
+    self.buffer = memoryview(buffer)
+    self.sections = dict()
+    self.strings = None
+
+    if len(self.buffer) < header_struct.size:
+      _ded()
+    magic, version, self.cteCount, self.eraCount, self.quadCount, self.stringCount = header_struct.unpack_from(self.buffer)
+    if magic != OBJ_MAGIC or version != OBJ_VERSION:
+      _ded()
+
+    # Offsets of every section
+    self.rangesStart = header_struct.size
+    self.ctesStart = self.rangesStart + ranges_struct.size
+    self.erasStart = self.ctesStart + self.cteCount * cte_struct.size
+    self.quadsStart = self.erasStart + self.eraCount * era_struct.size
+    self.stringsStart = self.quadsStart + self.quadCount * quad_struct.size
+    if len(self.buffer) < self.stringsStart:
+      _ded()
+
+  ## GETTERS
+  # Get a section, decoding it if it hasn't been already
+  def __getitem__(self, name):
+    if name not in self.sections:
+      self.sections[name] = getattr(self, f'_read{name.capitalize()}')()
+    return self.sections[name]
+
+  # Get a string from the string table
+  def getString(self, index):
+    if self.strings is None:
+      self._readStrings()
+    return self.strings[index]
+
+  ## DECODING
+  # Decode the string table
+  def _readStrings(self):
+    self.strings = []
+    offset = self.stringsStart
+    for _ in range(self.stringCount):
+      length, = strlen_struct.unpack_from(self.buffer, offset)
+      offset += strlen_struct.size
+      self.strings.append(str(self.buffer[offset:offset + length], 'utf-8'))
+      offset += length
+
+  # Decode the ranges
+  def _readRanges(self):
+    addrs = ranges_struct.unpack_from(self.buffer, self.rangesStart)
+    return [addrs[i:i + 5] for i in range(0, 20, 5)]
+
+  # Decode the constants
+  def _readCtes(self):
+    section = self.buffer[self.ctesStart:self.erasStart]
+    return [(cte_unpackers[t](raw), cte_types[t], vAddr) for t, vAddr, raw in cte_struct.iter_unpack(section)]
+
+  # Decode the ERAs
+  def _readEras(self):
+    section = self.buffer[self.erasStart:self.quadsStart]
+    return [(self.getString(era[0]), list(era[1:5]), list(era[5:9])) for era in era_struct.iter_unpack(section)]
+
+  # Decode the quads, one record at a time
+  def _readQuads(self):
+    section = self.buffer[self.quadsStart:self.stringsStart]
+    return _QuadRecords(self, section)
+
+  # Decode the source line of every quad
+  def _readLines(self):
+    section = self.buffer[self.quadsStart:self.stringsStart]
+    return [record[0] for record in quad_struct.iter_unpack(section)]
+
+# Quads of a binary program, decoded as they get iterated over
+class _QuadRecords:
+  def __init__(self, program, section):
+    self.program = program
+    self.section = section
+
+  def __len__(self):
+    return self.program.quadCount
+
+  def __iter__(self):
+    getString = self.program.getString
+    for _, op, kinds, left, right, result in quad_struct.iter_unpack(self.section):
+      leftKind, rightKind, resultKind = kinds & 3, kinds >> 2 & 3, kinds >> 4
+      yield (
+        getString(op),
+        None if leftKind == FIELD_NONE else getString(left) if leftKind == FIELD_STR else left,
+        None if rightKind == FIELD_NONE else getString(right) if rightKind == FIELD_STR else right,
+        None if resultKind == FIELD_NONE else getString(result) if resultKind == FIELD_STR else result
+      )
+
+# Check whether some bytes start like a binary .o file
+def isBinaryObj(data):
+  return bytes(data[:len(OBJ_MAGIC)]) == OBJ_MAGIC
+
+# Read a .o file into a program, whichever its format
+# NOTE: Binary files are mapped into memory rather than read, the map outlives the file being closed
+def readObj(filename):
+  try:
+    with open(filename, 'rb') as f:
+      if isBinaryObj(f.read(len(OBJ_MAGIC))):
+        return BinaryProgram(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+      f.seek(0)
+      return parseObj(f.read().decode())
+  except FileNotFoundError:
+    raise Exception(f'{filename} does not exist!')
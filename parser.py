@@ -1,25 +1,22 @@
 
 from lexer import tokens
-from functionDirectory import FunctionDirectory
-from quadManager import QuadManager
 
-funcDir = FunctionDirectory()
-quads = QuadManager(funcDir)
+# NOTE: Every rule works on the function directory and quad manager of the compilation in progress,
+# which Compiler hands over through the parser (p.parser), so nothing here outlives a compilation
 
 # Parsing productions
 # PROGRAM
 def p_program(p):
   "program : PROGRAM ID found_program_name ';' vars functions main body"
+  quads = p.parser.quads
   # Finish parsing
   quads.addEndQuad()
   p[0] = quads
 
-  # Build .o
-  quads.build()
-
 # Make a GOTO quad to main()
 def p_found_program_name(p):
   'found_program_name : empty'
+  quads, funcDir = p.parser.quads, p.parser.funcDir
   if quads.debug:
       print("\n|==|==|==|==|==|==|==|==| START DEBUG LOG |==|==|==|==|==|==|==|==|\n")
 
@@ -36,6 +33,7 @@ def p_vars(p):
 
 def p_found_var(p):
   "found_var : empty"
+  funcDir = p.parser.funcDir
   funcDir.createVarTable()
 
 def p_var_declare(p):
@@ -51,6 +49,7 @@ def p_var_name(p):
 # Create var upon finding its ID
 def p_variable_declare(p):
   "variable_declare : ID"
+  quads, funcDir = p.parser.quads, p.parser.funcDir
   var = p[1]
   if funcDir.varAvailable(var):
     funcDir.addVar(var, quads.vDir.generateVirtualAddress(funcDir.currentFunc, funcDir.currentType))
@@ -66,6 +65,7 @@ def p_var_no_dims(p):
 def p_var_dims(p):
   """var_dims : dim dim
               | dim"""
+  quads, funcDir = p.parser.quads, p.parser.funcDir
   if len(p) == 3:
     funcDir.setVarDims([p[1], p[2]])
     p[0] = p[1] * p[2]
@@ -81,6 +81,7 @@ def p_type(p):
           | FLOAT
           | CHAR
           | BOOL"""
+  funcDir = p.parser.funcDir
   funcDir.setCurrentType(p[1])
   p[0] = p[1]
 
@@ -94,12 +95,14 @@ def p_functions(p):
 def p_func_type(p):
   """func_type : type
                | VOID"""
+  funcDir = p.parser.funcDir
   if p[1] == 'void':
     funcDir.setCurrentType('void')
 
 # Create function
 def p_found_func_name(p):
   "found_func_name : empty"
+  funcDir = p.parser.funcDir
   func = p[-1]
   if funcDir.functionExists(func):
     s_error(f'Function "{func}" already exists!"')
@@ -115,6 +118,7 @@ def p_func_no_dims(p):
 def p_func_dims(p):
   """func_dims : dim dim
                | dim"""
+  funcDir = p.parser.funcDir
   if len(p) == 3:
     funcDir.setReturnDims([p[1], p[2]])
   else:
@@ -139,6 +143,7 @@ def p_func_param(p):
 # Add function parameter
 def p_found_func_param(p):
   "found_func_param : empty"
+  quads, funcDir = p.parser.quads, p.parser.funcDir
   param = p[-1]
   if funcDir.varAvailable(param):
     funcDir.setVarHelper(param)
@@ -156,6 +161,7 @@ def p_param_no_dims(p):
 def p_param_dims(p):
   """param_dims : dim dim
                 | dim"""
+  quads, funcDir = p.parser.quads, p.parser.funcDir
   space = None
   if len(p) == 3:
     p[0] = [p[1], p[2]]
@@ -171,17 +177,20 @@ def p_param_dims(p):
 # Set quad start for start of function
 def p_found_func_start(p):
   "found_func_start : empty"
+  quads, funcDir = p.parser.quads, p.parser.funcDir
   funcDir.setQuadStart(quads.getQuadCount())
 
 # Prepare end of function
 def p_found_func_end(p):
   "found_func_end : empty"
+  quads, funcDir = p.parser.quads, p.parser.funcDir
   quads.addEndFuncQuad()
   funcDir.deleteVarTable()
 
 # MAIN
 def p_main(p):
   "main : MAIN '(' ')'"
+  quads = p.parser.quads
   quads.completeMainQuad()
 
 # BODY
@@ -215,11 +224,13 @@ def p_assignment(p):
 # Add assignment quadruple
 def p_found_assignment_end(p):
   "found_assignment_end : empty"
+  quads = p.parser.quads
   quads.addAssignQuad()
 
 ## RETURN
 def p_return(p):
   "return : RETURN '(' expr ')' ';'"
+  quads = p.parser.quads
   quads.addReturnQuad()
 
 ## READ
@@ -235,6 +246,7 @@ def p_read_params(p):
 # Add read quadruple
 def p_found_read_param(p):
   "found_read_param : empty"
+  quads = p.parser.quads
   quads.addReadQuad()
 
 ## PRINT
@@ -250,21 +262,25 @@ def p_print_params(p):
 # Add print quadruple
 def p_print_param(p):
   "print_param : expr"
+  quads = p.parser.quads
   quads.addPrintQuad(False)
 
 # Add print quadruple
 def p_print_string(p):
   "print_param : STRING"
+  quads = p.parser.quads
   quads.addPrintQuad(p[1])
 
 ## IF
 def p_if(p):
   """if : IF '(' expr ')' found_if_expr THEN body
         | IF '(' expr ')' found_if_expr THEN body else"""
+  quads = p.parser.quads
   quads.completeIfQuad()
 
 def p_found_if_expr(p):
   "found_if_expr : empty"
+  quads = p.parser.quads
   quads.addGoToFQuad()
 
 ## ELSE
@@ -274,42 +290,51 @@ def p_else(p):
 
 def p_found_else(p):
   "found_else : empty"
+  quads = p.parser.quads
   quads.addElseQuad()
 
 ## FROM
 def p_from(p):
   "from : FROM '(' ID found_from_iterator '=' expr found_from_start TO expr ')' found_from_cond DO body"
+  quads = p.parser.quads
   quads.addFromEndQuads()
 
 def p_found_from_iterator(p):
   "found_from_iterator : empty"
+  quads = p.parser.quads
   quads.addFromIteratorQuads(p[-1])
 
 
 def p_found_from_start(p):
   "found_from_start : empty"
+  quads = p.parser.quads
   quads.addFromStartQuad()
 
 def p_found_from_cond(p):
   "found_from_cond : empty"
+  quads = p.parser.quads
   quads.addFromCondQuads()
 
 ## WHILE
 def p_while(p):
   "while : WHILE found_while '(' expr ')' found_while_expr DO body"
+  quads = p.parser.quads
   quads.completeLoopQuad()
 
 def p_found_while(p):
   "found_while : empty"
+  quads = p.parser.quads
   quads.prepareLoop()
 
 def p_found_while_expr(p):
   "found_while_expr : empty"
+  quads = p.parser.quads
   quads.addGoToFQuad()
 
 ## BREAK
 def p_break(p):
   "break : BREAK ';'"
+  quads = p.parser.quads
   quads.addBreakQuad()
 
 # EXPRESSION -> Order of operator precedence:
@@ -328,6 +353,7 @@ def p_expr_logic(p):
 
 def p_found_expr_logic(p):
   "found_expr_logic : empty"
+  quads = p.parser.quads
   quads.addDualOpQuad(['&', '|'])
 
 def p_expr_logic2(p):
@@ -342,6 +368,7 @@ def p_expr_compare(p):
 
 def p_found_expr_compare(p):
   "found_expr_compare : empty"
+  quads = p.parser.quads
   quads.addDualOpQuad(['==', '!=', '<', '<=', '>', '>='])
 
 def p_expr_compare2(p):
@@ -360,6 +387,7 @@ def p_expr_arith(p):
 
 def p_found_expr_arith(p):
   "found_expr_arith : empty"
+  quads = p.parser.quads
   quads.addDualOpQuad(['+', '-'])
 
 def p_expr_arith2(p):
@@ -374,6 +402,7 @@ def p_expr_factor(p):
 
 def p_found_expr_factor(p):
   "found_expr_factor : empty"
+  quads = p.parser.quads
   quads.addDualOpQuad(['*', '/', '%', '.'])
 
 def p_expr_factor2(p):
@@ -386,6 +415,7 @@ def p_expr_factor2(p):
 
 def p_found_expr_duo_op(p):
   "found_expr_duo_op : empty"
+  quads = p.parser.quads
   quads.pushOperator(p[-1])
 
 def p_expr_mono(p):
@@ -401,6 +431,7 @@ def p_expr_mono_op(p):
 
 def p_found_expr_mono_op(p):
   "found_expr_mono_op : empty"
+  quads = p.parser.quads
   quads.addMonoOpQuad(p[-1])
 
 def p_expr_atom(p):
@@ -411,6 +442,7 @@ def p_expr_atom(p):
 
 def p_expr_group(p):
   "expr_group : '(' found_expr_duo_op expr ')'"
+  quads = p.parser.quads
   quads.popOperator()
 
 def p_expr_var(p):
@@ -419,6 +451,7 @@ def p_expr_var(p):
 
 def p_expr_var_name(p):
   "expr_var_name : ID"
+  quads, funcDir = p.parser.quads, p.parser.funcDir
   var = funcDir.getVar(p[1])
   funcDir.setVarHelper(var.name)
   quads.pushVar(var)
@@ -430,18 +463,22 @@ def p_expr_var_no_dims(p):
 def p_expr_var_dims(p):
   """expr_var_dims : found_expr_var_dims expr_var_dim expr_var_dim
                    | found_expr_var_dims expr_var_dim"""
+  quads = p.parser.quads
   quads.addBaseAddressQuad()
 
 def p_found_expr_var_dims(p):
   "found_expr_var_dims : empty"
+  quads, funcDir = p.parser.quads, p.parser.funcDir
   quads.sDims.append((funcDir.varHelper, 0))
 
 def p_expr_var_dim(p):
   "expr_var_dim : '[' expr_var_open_dim expr ']'"
+  quads = p.parser.quads
   quads.addArrQuads()
 
 def p_expr_var_open_dim(p):
   "expr_var_open_dim : empty"
+  quads, funcDir = p.parser.quads, p.parser.funcDir
   aux = quads.sDims.pop()
   if aux[1] + 1 > len(funcDir.getDimensionsOfVar(aux[0])):
     raise Exception(f'{aux[0]} has {len(funcDir.getDimensionsOfVar(aux[0]))} dimension(s)! -> {aux[1]}')
@@ -454,6 +491,7 @@ def p_cte(p):
               | CTE_FLOAT
               | CTE_BOOL
               | CTE_CHAR"""
+  quads = p.parser.quads
   t = None
   if (type(p[1]) is int):
     t = 'int'
@@ -469,17 +507,20 @@ def p_cte(p):
 
 def p_expr_call_func(p):
   "expr_call_func : ID found_call_func_name '(' call_func_params ')' found_call_func_end"
+  quads = p.parser.quads
   quads.addAssignFuncQuad()
 
 ## CALL_FUNCTION
 def p_call_func(p):
   "call_func : ID found_call_func_name '(' call_func_params ')' found_call_func_end ';'"
+  quads = p.parser.quads
   func = quads.popFunction()
   if quads.funcDir.getReturnTypeOfFunc(func) != 'void':
     raise Exception(f"This function is non-void, therefore it can't be used as an expression! -> {func}")
 
 def p_found_call_func_name(p):
   "found_call_func_name : empty"
+  quads, funcDir = p.parser.quads, p.parser.funcDir
   func = p[-1]
   if funcDir.functionExists(func):
     quads.addEraQuad(func)
@@ -500,6 +541,7 @@ def p_call_func_param(p):
 
 def p_func_single_step(p):
   "func_single_step : empty"
+  quads, funcDir = p.parser.quads, p.parser.funcDir
   target_param = funcDir.getParamOfFunc(quads.getTopFunction())
   quads.addParamQuad(target_param, funcDir.paramCount)
   funcDir.incrementParamCount()
@@ -507,6 +549,7 @@ def p_func_single_step(p):
 
 def p_found_call_func_end(p):
   "found_call_func_end : empty"
+  quads, funcDir = p.parser.quads, p.parser.funcDir
   func = quads.getTopFunction()
   if funcDir.verifyParamCount(func):
     funcDir.resetParamCount()
@@ -0,0 +1,84 @@
+import os
+import pickle
+import tempfile
+from hashlib import sha256
+from ply import yacc
+
+# Bump whenever the layout of the saved tables changes
+TABLES_VERSION = 1
+
+# Tables holding everything LRParser needs, either freshly built or read from disk
+class ParseTables:
+  def __init__(self, productions, action, goto):
+    self.lr_productions = productions
+    self.lr_action = action
+    self.lr_goto = goto
+
+## TABLE FILES
+# Get where a parser module's tables are saved, named after its grammar's signature
+# NOTE: The signature covers the start symbol, precedence, tokens and every rule's docstring. Rule functions
+# are looked up by name when the tables are read, so their names go in too
+def getTablesFilename(module, pinfo):
+  names = ' '.join(func[2] for func in pinfo.pfuncs)
+  key = sha256(f'{TABLES_VERSION}:{pinfo.signature()}:{names}'.encode()).hexdigest()[:16]
+  folder = os.path.join(os.path.dirname(os.path.abspath(module.__file__)), '__pycache__')
+  return os.path.join(folder, f'{module.__name__}.{key}.lrtab')
+
+# Read saved tables, or None if there are none (or they can't be used)
+def readTables(filename):
+  try:
+    with open(filename, 'rb') as f:
+      return pickle.load(f)
+  except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+    return None
+
+# Save a parser's tables
+# NOTE: Written to a temporary file first, so other processes never read half a file
+def writeTables(filename, parser):
+  tables = {
+    'productions': [(p.name, p.prod, p.func) for p in parser.productions],
+    'action': parser.action,
+    'goto': parser.goto
+  }
+
+  tmp = None
+  try:
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(filename), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+      pickle.dump(tables, f, pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, filename)
+  except (OSError, pickle.PicklingError):     # Not being able to save them only means building them again next time
+    pass
+  finally:
+    if tmp is not None and os.path.exists(tmp):
+      os.remove(tmp)
+
+## PARSER
+# Build a parser for a module, loading its tables from disk when its grammar hasn't changed
+def buildParser(module):
+  pdict = {name: getattr(module, name) for name in dir(module)}
+  pinfo = yacc.ParserReflect(pdict)
+  pinfo.get_all()
+  if pinfo.error:
+    raise yacc.YaccError('Unable to build parser')
+
+  filename = getTablesFilename(module, pinfo)
+  tables = readTables(filename)
+
+  # Rebuild the productions, as long as every rule function they name is still around
+  if tables is not None:
+    try:
+      productions = []
+      for number, (name, prod, func) in enumerate(tables['productions']):
+        production = yacc.Production(number, name, prod, func=func)
+        production.bind(pdict)
+        productions.append(production)
+      return yacc.LRParser(ParseTables(productions, tables['action'], tables['goto']), pinfo.error_func)
+    except (KeyError, TypeError, ValueError):
+      pass
+
+  # Generate them from scratch and keep them for next time
+  parser = yacc.yacc(module=module)
+  writeTables(filename, parser)
+  return parser
@@ -0,0 +1,192 @@
+import json
+import sys
+from time import perf_counter_ns
+
+# Rows shown in each table of the report
+TOP_ROWS = 15
+
+# Get the function every quad belongs to
+# NOTE: Functions are laid out one after the other, each closed by its EndFunc, in the same order as
+# their ERAs. Main comes last, after them, and its GoTo is quad 0
+def getQuadFunctions(program):
+  names = [era[0] for era in program['eras']]
+  funcs = []
+  current = 0
+  for i, quad in enumerate(program['quads']):
+    if i == 0 or current >= len(names):
+      funcs.append('main')
+      continue
+
+    funcs.append(names[current])
+    if quad[0] == 'EndFunc':
+      current += 1
+  return funcs
+
+# Execution counts and time spent on every quad of a program
+class QuadProfile:
+  def __init__(self, program):
+    self.ops = [quad[0] for quad in program['quads']]
+    self.lines = list(program['lines'])
+    self.funcs = getQuadFunctions(program)
+    self.counts = [0] * len(self.ops)
+    self.times = [0] * len(self.ops)     # NOTE: In nanoseconds
+
+  ## GETTERS
+  # Get the total time spent running quads
+  def getTotalTime(self):
+    return sum(self.times)
+
+  # Get the count and time of every quad that ran, as rows
+  def getQuadRows(self):
+    return [
+      {'index': i, 'op': self.ops[i], 'line': self.lines[i], 'function': self.funcs[i], 'count': self.counts[i], 'time': self.times[i]}
+      for i in range(len(self.ops)) if self.counts[i]
+    ]
+
+  # Get the count and time of every quad that ran, added up by a key (line or function)
+  def getGroupedRows(self, key):
+    groups = dict()
+    for row in self.getQuadRows():
+      group = groups.setdefault(row[key], {key: row[key], 'count': 0, 'time': 0})
+      group['count'] += row['count']
+      group['time'] += row['time']
+    return list(groups.values())
+
+  ## OUTPUT
+  # Get everything recorded, ready to be dumped as JSON
+  def getDump(self):
+    return {
+      'total': self.getTotalTime(),
+      'quads': self.getQuadRows(),
+      'lines': sorted(self.getGroupedRows('line'), key=lambda row: row['line']),
+      'functions': self.getGroupedRows('function')
+    }
+
+  # Dump everything recorded into a JSON file
+  def dump(self, filename):
+    with open(filename, 'w') as f:
+      json.dump(self.getDump(), f, indent=2)
+
+  # Print the hottest functions, source lines and quads
+  # NOTE: Counts are quads executed, so a line runs `count` quads' worth, not `count` times
+  def report(self, source=None, out=sys.stderr):
+    total = self.getTotalTime() or 1
+    sourceLines = source.split('\n') if source else []
+
+    def printTable(title, rows, label, describe):
+      print(f'\n{title}', file=out)
+      print(f'{"time (ms)":>12} {"%":>6} {"quads run":>12}  {label}', file=out)
+      for row in sorted(rows, key=lambda row: row['time'], reverse=True)[:TOP_ROWS]:
+        print(f'{row["time"] / 1e6:12.3f} {100 * row["time"] / total:6.1f} {row["count"]:12}  {describe(row)}', file=out)
+
+    def describeLine(row):
+      line = row['line']
+      text = sourceLines[line - 1].strip() if 0 < line <= len(sourceLines) else ''
+      return f'{line:>5}  {text}'
+
+    def describeQuad(row):
+      return f'#{row["index"]:<5} {row["op"]:<8} (line {row["line"]}, {row["function"]})'
+
+    print(f'\n=== HONK PROFILE === ({total / 1e6:.3f} ms in quads)', file=out)
+    printTable('Functions', self.getGroupedRows('function'), 'function', lambda row: row['function'])
+    printTable('Lines', self.getGroupedRows('line'), ' line  source', describeLine)
+    printTable('Quads', self.getQuadRows(), 'quad', describeQuad)
+
+# Calls, inclusive and exclusive time of every function, the edges between callers and callees,
+# and the time spent under every call stack
+# NOTE: A function's inclusive time only counts its outermost call, so recursion isn't counted twice.
+# All times are in nanoseconds
+class CallProfile:
+  def __init__(self, program):
+    self.funcs = getQuadFunctions(program)
+    self.calls = dict()
+    self.inclusive = dict()
+    self.exclusive = dict()
+    self.edges = dict()       # (caller, callee) -> [calls, inclusive time]
+    self.stacks = dict()      # Call stack (tuple of functions) -> exclusive time
+    self.sFrames = []         # Active calls -> [function, stack, start, time spent in callees]
+    self.active = dict()      # Function -> how many of its calls are active
+
+  ## TRACKING
+  # Start timing main
+  def start(self):
+    self.enter('main')
+
+  # Stop timing whatever is still running, main included
+  def finish(self):
+    while self.sFrames:
+      self.leave()
+
+  # Step into a function
+  def enter(self, func):
+    if self.sFrames:
+      caller = self.sFrames[-1]
+      stack = caller[1] + (func,)
+      edge = self.edges.setdefault((caller[0], func), [0, 0])
+      edge[0] += 1
+    else:
+      stack = (func,)
+
+    self.calls[func] = self.calls.get(func, 0) + 1
+    self.active[func] = self.active.get(func, 0) + 1
+    self.sFrames.append([func, stack, perf_counter_ns(), 0])
+
+  # Step out of the current function
+  def leave(self):
+    func, stack, start, calleeTime = self.sFrames.pop()
+    elapsed = perf_counter_ns() - start
+    self.exclusive[func] = self.exclusive.get(func, 0) + elapsed - calleeTime
+    self.stacks[stack] = self.stacks.get(stack, 0) + elapsed - calleeTime
+
+    self.active[func] -= 1
+    if self.active[func] == 0:
+      self.inclusive[func] = self.inclusive.get(func, 0) + elapsed
+
+    if self.sFrames:
+      caller = self.sFrames[-1]
+      caller[3] += elapsed
+      if func != caller[0]:
+        self.edges[(caller[0], func)][1] += elapsed
+
+  # Wrap GoSub's handler, stepping into the function it jumps to
+  def wrapCall(self, handler):
+    funcs = self.funcs
+    def call(ip, quad):
+      self.enter(funcs[quad[3]])
+      return handler(ip, quad)
+    return call
+
+  # Wrap the handler of a quad leaving a function (RETURN, EndFunc), stepping out of it
+  def wrapLeave(self, handler):
+    def leave(ip, quad):
+      nextIp = handler(ip, quad)
+      self.leave()
+      return nextIp
+    return leave
+
+  ## OUTPUT
+  # Get the time spent under every call stack, as collapsed stacks ("main;fib;fib 1234", in microseconds)
+  # NOTE: The format flamegraph.pl, speedscope and inferno read
+  def getCollapsedStacks(self):
+    return [f'{";".join(stack)} {time // 1000}' for stack, time in sorted(self.stacks.items()) if time >= 1000]
+
+  # Dump the collapsed stacks into a file
+  def dump(self, filename):
+    with open(filename, 'w') as f:
+      for line in self.getCollapsedStacks():
+        f.write(f'{line}\n')
+
+  # Print every function's calls and times, and the edges between them
+  def report(self, out=sys.stderr):
+    total = self.inclusive.get('main', 0) or 1
+
+    print(f'\n=== HONK CALL PROFILE === ({total / 1e6:.3f} ms)', file=out)
+    print(f'\n{"calls":>10} {"incl (ms)":>12} {"%":>6} {"excl (ms)":>12} {"%":>6}  function', file=out)
+    for func in sorted(self.calls, key=lambda func: self.exclusive.get(func, 0), reverse=True)[:TOP_ROWS]:
+      incl, excl = self.inclusive.get(func, 0), self.exclusive.get(func, 0)
+      print(f'{self.calls[func]:10} {incl / 1e6:12.3f} {100 * incl / total:6.1f} {excl / 1e6:12.3f} {100 * excl / total:6.1f}  {func}', file=out)
+
+    print(f'\n{"calls":>10} {"incl (ms)":>12}  caller -> callee', file=out)
+    for (caller, callee), (calls, incl) in sorted(self.edges.items(), key=lambda edge: edge[1][0], reverse=True)[:TOP_ROWS]:
+      incl = f'{incl / 1e6:12.3f}' if caller != callee else f'{"(recursive)":>12}'
+      print(f'{calls:10} {incl}  {caller} -> {callee}', file=out)
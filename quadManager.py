@@ -1,22 +1,43 @@
 
-import config
-from collections import deque
-from semanticCube import getDuoResultType, getMonoResultType
-from virtualDirectory import VirtualDirectory
+from collections import deque, defaultdict
+from semanticCube import getDuoResultType, getMonoResultType, getDuoFunction
+from virtualDirectory import VirtualDirectory, POINTER_BIT
+from flowGraph import FlowGraph, Liveness, read_operands, write_operands, dual_ops, sized_ops
+from objFile import writeObj
+
+# Operations whose result can go straight into the variable it gets assigned to
+# NOTE: '$' is left out, since its result gets truncated when stored into an int temp
+store_ops = dual_ops + ['=>']
+
+# Operations that do nothing besides writing their result, so they can go once nothing reads it
+# NOTE: '/' and '%' only can when dividing by a constant other than 0, since dividing by zero has to fail.
+# '?' fails on matrices that can't be inverted, '=>' takes the called function's value off the stack
+pure_ops = ['+', '-', '*', '==', '!=', '<', '<=', '>', '>=', '&', '|', '=', '$', '!', '·', '+->']
+
+# Operations that overflow when their result is an int too big to hold
+int_ops = ['+', '-', '*', '·', '$']
+
+# Bounds of the values an int can hold in memory
+INT_MIN = -(1 << 63)
+INT_MAX = (1 << 63) - 1
 
 class QVar:
-  def __init__(self, name, vAddr, vartype, dims):
+  def __init__(self, name, vAddr, vartype, dims, isCte=False, isTemp=False):
     self.name = name
     self.vAddr = vAddr
     self.vartype = vartype
     self.dims = dims
+    self.isCte = isCte    # NOTE: Constants are named after their value
+    self.isTemp = isTemp
 
 class QuadManager:
-  def __init__(self, funcDir):
-    self.debug = config.debugParser
+  def __init__(self, funcDir, debug=False):
+    self.debug = debug
     self.funcDir = funcDir
     self.vDir = VirtualDirectory()
-    self.quads = deque()
+    self.quads = []           # NOTE: Quads are kept as lists while compiling, so jumps get completed in place
+    self.lines = []           # Source line each quad came from
+    self.currentLine = 0      # NOTE: Kept up to date by Compiler as tokens get read
     self.sVars = deque()
     self.sOperators = deque()
     self.sJumps = deque()
@@ -26,6 +47,10 @@ class QuadManager:
     self.quadCount = 0
     self.tempCount = 0
     self.returnCount = 0
+    self.mainStart = None
+    self.topLevelQuads = set()
+    self.freeTemps = defaultdict(list)
+    self.tempSizes = dict()
 
   ## GETTERS
   # Get function from top of stack
@@ -40,6 +65,13 @@ class QuadManager:
   def getTempCount(self):
     return self.tempCount
 
+  # Check if quads are currently being added outside of any condition or loop
+  # NOTE: Functions are always inside the jump to main, which is pending until main is found
+  def isTopLevel(self):
+    if self.funcDir.currentFunc == self.funcDir.globalFunc:
+      return len(self.sJumps) == 0
+    return len(self.sJumps) == 1
+
   ## PUSH
   # Push variable to var stack
   def pushVar(self, var):
@@ -48,12 +80,12 @@ class QuadManager:
 
   # Push constant to var stack
   def pushCte(self, cte):
-    qvar = QVar(cte.value, cte.vAddr, cte.vartype, [])
+    qvar = QVar(cte.value, cte.vAddr, cte.vartype, [], True)
     self.sVars.append(qvar)
 
   # Push temporary value to var stack
   def pushTemp(self, vAddr, vartype, dims):
-    qvar = QVar(f't{self.tempCount}', vAddr, vartype, dims)
+    qvar = QVar(f't{self.tempCount}', vAddr, vartype, dims, isTemp=True)
     self.sVars.append(qvar)
 
   # Push operator to stack
@@ -78,14 +110,13 @@ class QuadManager:
   def addQuad(self, quad):
     if self.debug:
       print(f'{self.quadCount}:\t{quad[0]}\t{quad[1]}\t{quad[2]}\t{quad[3]}')
-    self.quads.append(quad)
+    self.quads.append(list(quad))
+    self.lines.append(self.currentLine)
     self.quadCount += 1
 
   # General function to complete quad
   def completeQuad(self, index, jump):
-    quadToChange = list(self.quads[index])
-    quadToChange[3] = jump
-    self.quads[index] = tuple(quadToChange)
+    self.quads[index][3] = jump
 
     if self.debug:
       print(f'\t\t\t\t\t! Completed quad #{index} with jump to {jump}')
@@ -100,6 +131,7 @@ class QuadManager:
   def completeMainQuad(self):
     ret = self.sJumps.pop()
     self.completeQuad(ret, self.quadCount)
+    self.mainStart = self.quadCount
 
     if self.debug:
       print(f'--- main')
@@ -119,8 +151,11 @@ class QuadManager:
 
     if left.dims:
       self.addMatQuad(left.dims)
+    elif self.isTopLevel():   # Assignments that always run are candidates for constant propagation
+      self.topLevelQuads.add(self.quadCount)
 
     self.addQuad((operator, right.vAddr, None, left.vAddr))
+    self.releaseTemps(left, right)
 
   # Append dual-operand operation quad
   def addDualOpQuad(self, ops):
@@ -144,16 +179,31 @@ class QuadManager:
     if not self.areCompatibleDims(left.dims, right.dims):
       raise Exception(f'Dimension mismatch! {left.dims} != {right.dims}')
 
+    # Operations between constants are solved right away
+    if left.isCte and right.isCte:
+      value = self.foldConstants(operator, left.name, left.vartype, right.name, right.vartype)
+      if value is not None:
+        self.pushCte(self.upsertCte(value, result_type))
+        if self.debug:
+          print(f'\t\t\t\t\t! Folded {left.name} {operator} {right.name} -> {value}')
+        return
+
     if left.dims:
       self.addMatQuad(left.dims)
 
-    result = self.vDir.generateVirtualAddress('temp', result_type)
+    # Arrays and matrices need room for their whole result
+    space = self.getDimsSize(left.dims)
+    result = self.newTemp(result_type, space)
+    if self.debug:
+      if left.dims:
+        print(f'\t\t\t\t\t>> TMP: t{self.tempCount} - {result_type}{left.dims} -> {result} - {result + space - 1}')
+      else:
+        print(f'\t\t\t\t\t> TMP: t{self.tempCount} - {result_type} -> {result}')
+
     self.addQuad((operator, left.vAddr, right.vAddr, result))
+    self.releaseTemps(left, right)
     self.pushTemp(result, result_type, left.dims)
 
-    if self.debug:
-      print(f'\t\t\t\t\t> TMP: t{self.tempCount} - {result_type} -> {result}')
-
     self.tempCount += 1
 
   # Append mono-operand operation quad
@@ -176,17 +226,17 @@ class QuadManager:
     elif operator == '!':   # '!' swaps the dimensions
       result_dims = [mat.dims[1], mat.dims[0]]
 
-    result = self.vDir.generateVirtualAddress('temp', result_type)
+    space = self.getDimsSize(result_dims)
+    result = self.newTemp(result_type, space)
     if self.debug:
-      print(f'\t\t\t\t\t> TMP: t{self.tempCount} - {result_type} -> {result}')
-
-    if result_dims:
-      self.vDir.makeSpaceForArray('temp', result_type, result_dims[0] * result_dims[1])
-      if self.debug:
-        print(f'\t\t\t\t\t>> TMP: t{self.tempCount} - {result_type}{result_dims} -> {result} - {result + result_dims[0] * result_dims[1] - 1}')
+      if result_dims:
+        print(f'\t\t\t\t\t>> TMP: t{self.tempCount} - {result_type}{result_dims} -> {result} - {result + space - 1}')
+      else:
+        print(f'\t\t\t\t\t> TMP: t{self.tempCount} - {result_type} -> {result}')
 
     self.addMatQuad(mat.dims)
     self.addQuad((operator, mat.vAddr, None, result))
+    self.releaseTemps(mat)
     self.pushTemp(result, result_type, result_dims)
     self.tempCount += 1
 
@@ -204,14 +254,14 @@ class QuadManager:
       raise Exception(f'Incompatible dimensions! {left.dims} {right.dims}')
 
     result_dims = [left.dims[0], right.dims[1]]
-    result = self.vDir.generateVirtualAddress('temp', result_type)
-    self.vDir.makeSpaceForArray('temp', result_type, result_dims[0] * result_dims[1])
+    result = self.newTemp(result_type, self.getDimsSize(result_dims))
 
     if self.debug:
       print(f'\t\t\t\t\t! Preparing dot product for dims {left.dims} · {right.dims}')
 
     self.addQuad(('MAT·', left.dims[0], left.dims[1], right.dims[1]))
     self.addQuad(('·', left.vAddr, right.vAddr, result))
+    self.releaseTemps(left, right)
     self.pushTemp(result, result_type, result_dims)
     self.tempCount += 1
 
@@ -268,6 +318,7 @@ class QuadManager:
       self.addMatQuad(return_dims)
 
     self.addQuad(('RETURN', None, None, return_addr))
+    self.releaseTemps(var)
     self.returnCount += 1
 
   # Append READ quadruple
@@ -278,6 +329,7 @@ class QuadManager:
       self.addMatQuad(var.dims)
 
     self.addQuad(('READ', None, None, var.vAddr))
+    self.releaseTemps(var)
 
   # Append PRINT quadruple
   def addPrintQuad(self, string):
@@ -292,6 +344,7 @@ class QuadManager:
       self.addMatQuad(var.dims)
 
     self.addQuad(('PRINT', None, None, var.vAddr))
+    self.releaseTemps(var)
 
   # Append GoToF quadruple
   def addGoToFQuad(self):
@@ -303,6 +356,7 @@ class QuadManager:
     if result.vartype == 'bool':
       self.addQuad(('GoToF', result.vAddr, None, None))
       self.sJumps.append(self.quadCount - 1)
+      self.releaseTemps(result)
     else:
       raise Exception(f'Type mismatch! {result.vartype} != bool')
 
@@ -386,7 +440,12 @@ class QuadManager:
 
     aux = self.sDims[-1]
     dims = self.funcDir.getDimensionsOfVar(aux[0])
-    self.addQuad(('VERIFY', var.vAddr, None, dims[aux[1] - 1]))
+    limit = dims[aux[1] - 1]
+    if var.isCte:   # Constant indexes are verified right away
+      if var.name < 0 or var.name >= limit:
+        raise Exception(f'{var.name} is out of bounds of range 0-{limit - 1}')
+    else:
+      self.addQuad(('VERIFY', var.vAddr, None, limit))
 
     # Only do the following for first dimension and if a second dimension exists
     if len(dims) - aux[1] == 1:
@@ -406,10 +465,19 @@ class QuadManager:
     offset = self.sVars.pop()
     arr = self.sVars.pop()
 
+    # Constant offsets point straight to the element
     result_type = arr.vartype
-    result = self.vDir.generateVirtualAddress('temp', result_type)
+    if offset.isCte:
+      self.sVars.append(QVar(arr.name, arr.vAddr + offset.name, result_type, arr.dims[depth:]))
+      if self.debug:
+        print(f'\t\t\t\t\t! Folded {arr.name} + {offset.name} -> ({arr.vAddr + offset.name})')
+      return
+
+    # NOTE: Pointers hold an address, so they always live in int memory
+    result = self.newTemp('int')
     self.addQuad(('+->', offset.vAddr, arr.vAddr, result))
-    self.pushTemp((result,), result_type, arr.dims[depth:])
+    self.releaseTemps(offset)
+    self.pushTemp(self.vDir.makePointer(result), result_type, arr.dims[depth:])
 
     if self.debug:
       print(f'\t\t\t\t\t> PTR: t{self.tempCount} - {result_type} -> ({result})')
@@ -433,6 +501,7 @@ class QuadManager:
     if param.dims:
       self.addMatQuad(param.dims)
     self.addQuad(('PARAM', param.vAddr, target_param[1], k))
+    self.releaseTemps(param)
 
   # Append GOSUB quad
   def addGoSubQuad(self, func, qs):
@@ -443,6 +512,7 @@ class QuadManager:
     if self.returnCount == 0 and self.funcDir.getCurrentFuncReturnType() != 'void':
       raise Exception("This function is missing a return statement!")
 
+    self.optimize(self.funcDir.getQuadStartOfFunc(self.funcDir.currentFunc))
     self.funcDir.setEra(self.vDir.getEra())
     self.resetFuncCounters()
     self.addQuad(('EndFunc', None, None, None))
@@ -455,10 +525,8 @@ class QuadManager:
     if return_type == 'void':   # Error out if the function is void
       raise Exception(f'This function is void and cannot be used as an expression! -> {func}')
 
-    result = self.vDir.generateVirtualAddress('temp', return_type)
+    result = self.newTemp(return_type, self.funcDir.getReturnSizeOfFunc(func))
     if return_dims:
-      space = self.funcDir.getReturnSizeOfFunc(func)
-      self.vDir.makeSpaceForArray('temp', return_type, space)
       self.addMatQuad(return_dims)
 
     self.addQuad(('=>', None, None, result))
@@ -474,7 +542,10 @@ class QuadManager:
 
   # Append END Quad
   def addEndQuad(self):
+    self.optimize(self.mainStart)
     self.addQuad(('END', None, None, None))
+    self.eliminateDeadFunctions()
+    self.eliminateUnusedCtes()
 
   ## FUNCTIONS (PARSING)
   # Reset temporal counter
@@ -482,8 +553,31 @@ class QuadManager:
     self.tempCount = 0
     self.returnCount = 0
     self.loopDepth = 0
+    self.freeTemps = defaultdict(list)
+    self.tempSizes = dict()
+    self.topLevelQuads = set()
     self.vDir.resetLocalCounters()
 
+  # Get a temp address for a value, reusing a released one of the same type and size if possible
+  def newTemp(self, vartype, space=1):
+    pool = self.freeTemps[(vartype, space)]
+    if pool:
+      result = pool.pop()
+    else:
+      result = self.vDir.generateVirtualAddress('temp', vartype)
+      self.vDir.makeSpaceForArray('temp', vartype, space)
+
+    self.tempSizes[result] = (vartype, space)
+    return result
+
+  # Release the temps of values that were just used up
+  # NOTE: Every temp on the stack is used exactly once, so its value is dead right after
+  def releaseTemps(self, *qvars):
+    for qvar in qvars:
+      if qvar.isTemp:
+        vAddr = qvar.vAddr & ~POINTER_BIT
+        self.freeTemps[self.tempSizes[vAddr]].append(vAddr)
+
   # Get a variable if it exists, otherwise create one and return it
   def upsertVar(self, name, vartype):
     if not self.funcDir.varExists(name):
@@ -498,6 +592,13 @@ class QuadManager:
       self.funcDir.addCte(value, vartype, vAddr)
     return self.funcDir.getCte(value, vartype)
 
+  # Get the amount of cells a set of dimensions takes up
+  def getDimsSize(self, dims):
+    space = 1
+    for d in dims:
+      space *= d
+    return space
+
   # Check if two variables are "compatible" in dimensions
   def areCompatibleDims(self, left_dims, right_dims):
     if len(left_dims) == 0 and len(right_dims) == 0:
@@ -543,41 +644,369 @@ class QuadManager:
       print("\t ", c.value, c.vartype, c.vAddr)
     print("\t - - - DEBUG END - - - ")
 
-  ## FUNCTIONS (BUILDING)
-  # Build .o file
-  def build(self):
-    filename = f'{config.objFilename}.o'
+  ## FUNCTIONS (OPTIMIZING)
+  # Solve an operation between two constants, if it's safe to do so at compile time
+  # NOTE: Whatever would fail at runtime (dividing by zero, overflowing an int) is left for the VM
+  def foldConstants(self, operator, left, left_type, right, right_type):
+    func = getDuoFunction(left_type, right_type, operator)
+    if not func:
+      return None
+
+    try:
+      value = func(left, right)
+    except ZeroDivisionError:
+      return None
+
+    result_type = getDuoResultType(left_type, right_type, operator)
+    if result_type == 'int' and not INT_MIN <= value <= INT_MAX:
+      return None
+    elif result_type == 'float':
+      value = float(value)
+    elif result_type == 'bool':
+      value = bool(value)
+    return value
+
+  # Propagate constants through a function's quads, folding whatever becomes constant along the way
+  # NOTE: Variables are only propagated if written once, at the top level of the function,
+  # and only to quads after their assignment.
+  def propagateConstants(self, start):
+    end = self.quadCount
+    isMain = self.funcDir.currentFunc == self.funcDir.globalFunc
+    varScope = 'main' if isMain else 'local'
+
+    ctes = dict()
+    for cte in self.funcDir.cteTable.values():
+      ctes[cte.vAddr] = cte
+
+    # Arrays and parameters are written outside of plain assignments
+    excluded = self.funcDir.getCurrentFuncArrayAddrs()
+    if not isMain:
+      excluded.update(self.funcDir.getParamAddrsOfFunc(self.funcDir.currentFunc))
+
+    # Count writes of every address, globals can be written by any function
+    writes = defaultdict(int)
+    for i in range(0 if isMain else start, end):
+      q = self.quads[i]
+      batch = i > 0 and self.quads[i - 1][0] in ['MAT', 'MAT·']
+      for pos in write_operands.get(q[0], ()):
+        if i >= start or self.vDir.getScope(q[pos] & ~POINTER_BIT) == 'main':
+          writes[q[pos]] += 1
+      if batch:
+        for pos in read_operands.get(q[0], ()) + write_operands.get(q[0], ()):
+          excluded.add(q[pos])
+
+    # Temps get reused, so what's known about one only holds until it's written again,
+    # and never past a jump target, since values may come from somewhere else there
+    labels = set()
+    for i in range(start, end):
+      if self.quads[i][0] in ['GoTo', 'GoToF']:
+        labels.add(self.quads[i][3])
+
+    known = dict()      # variable -> constant address
+    temps = dict()      # temp -> constant address
+    pointers = dict()   # pointer temp -> address it points to
+
+    # Resolve an operand into a known constant or, for pointers, the address it points to
+    def resolve(operand, isRead):
+      if not isinstance(operand, int):
+        return operand
+      if operand & POINTER_BIT:
+        return pointers.get(operand & ~POINTER_BIT, operand)
+      if isRead:
+        return known.get(operand, temps.get(operand, operand))
+      return operand
+
+    for i in range(start, end):
+      if i in labels:
+        temps.clear()
+        pointers.clear()
+
+      q = self.quads[i]
+      op = q[0]
+
+      # Batches work on whole blocks, so they're left untouched
+      if i > 0 and self.quads[i - 1][0] in ['MAT', 'MAT·']:
+        for pos in write_operands.get(op, ()):
+          temps.pop(q[pos], None)
+        continue
 
-    if self.debug:
-      print(f'> Building {filename}...')
+      reads = read_operands.get(op, ())
+      for pos in reads + write_operands.get(op, ()):
+        q[pos] = resolve(q[pos], pos in reads)
+
+      # Fold operations that ended up between constants
+      if op in dual_ops and q[1] in ctes and q[2] in ctes:
+        left, right = ctes[q[1]], ctes[q[2]]
+        value = self.foldConstants(op, left.value, left.vartype, right.value, right.vartype)
+        if value is not None:
+          cte = self.upsertCte(value, getDuoResultType(left.vartype, right.vartype, op))
+          ctes[cte.vAddr] = cte
+          q = ['=', cte.vAddr, None, q[3]]
+          if self.debug:
+            print(f'\t\t\t\t\t! Folded quad #{i}: {left.value} {op} {right.value} -> {value}')
+
+      # Remember what's now known to be constant
+      target = q[3]
+      if q[0] in write_operands and not target & POINTER_BIT:
+        temps.pop(target, None)
+        pointers.pop(target, None)
+
+        scope = self.vDir.getScope(target)
+        isCte = q[0] == '=' and q[1] in ctes and ctes[q[1]].vartype == self.vDir.getType(target)
+        if scope == 'temp':
+          if isCte:
+            temps[target] = q[1]
+          elif q[0] == '+->' and q[1] in ctes:
+            pointers[target] = q[2] + ctes[q[1]].value
+        elif isCte and scope == varScope and writes[target] == 1 and target not in excluded and i in self.topLevelQuads:
+          known[target] = q[1]
+
+      self.quads[i] = q
+
+  # Optimize the quads of the function that just ended, which are the last ones so far
+  # NOTE: Threading jumps can leave GoTos nothing reaches anymore, and removing them can leave GoTos
+  # to the next quad, so both keep going until neither finds anything else
+  def optimize(self, start):
+    self.propagateConstants(start)
+    self.eliminateDeadCode(start)
+    self.peephole(start)
+    while self.eliminateUnreachable(start) and self.peephole(start):
+      pass
+
+  # Clean up the quads of the function that just ended, which are the last ones so far
+  # Returns whether any quad was removed
+  # NOTE: Nothing outside of a function jumps into it (calls go to its start, which is never removed),
+  # so removing quads only moves the function's own jumps. The jump to main is always kept, as quad 0
+  def peephole(self, start):
+    end = self.quadCount
+    quads = self.quads
+    removed = set()
+
+    labels = set()
+    for i in range(start, end):
+      if quads[i][0] in ['GoTo', 'GoToF']:
+        labels.add(quads[i][3])
+
+    for i in range(start, end - 1):
+      q, nextQ = quads[i], quads[i + 1]
+
+      # MATs of a single cell size the next quad the same as no MAT at all
+      if q[0] == 'MAT' and q[1] * q[2] == 1 and nextQ[0] in sized_ops:
+        removed.add(i)
+
+      # Results only kept in a temp to be assigned right away get stored straight into the variable
+      # NOTE: Temps from newTemp() are read exactly once, unlike the iterators of 'from' loops
+      elif (q[0] in store_ops and nextQ[0] == '=' and nextQ[1] == q[3] and q[3] in self.tempSizes
+            and i + 1 not in labels and i not in removed and quads[i - 1][0] not in ['MAT', 'MAT·']):
+        if self.debug:
+          print(f'\t\t\t\t\t! Stored quad #{i} straight into ({nextQ[3]})')
+        q[3] = nextQ[3]
+        removed.add(i + 1)
+
+    # Get where a jump actually lands, skipping removed quads
+    def land(target):
+      while target in removed:
+        target += 1
+      return target
+
+    # Jumps landing on a GoTo go straight to where that one goes
+    for i in range(start, end):
+      q = quads[i]
+      if q[0] not in ['GoTo', 'GoToF'] or i in removed:
+        continue
 
-    f = open(filename, 'w')
-    # Write ranges
-    f.write('-> RANGES START\n')
-    for r in self.vDir.getRanges():
-      f.write(f'{r[0]}\t{r[1]}\t{r[2]}\t{r[3]}\t{r[4]}\n')
-    f.write('->| RANGES END\n')
-    # Write constants
-    f.write('-> CTES START\n')
+      target = land(q[3])
+      seen = {i}
+      while target < end and quads[target][0] == 'GoTo' and target not in seen:
+        seen.add(target)
+        target = land(quads[target][3])
+      q[3] = target
+
+    # GoTos to the next quad left do nothing
+    following = end
+    for i in range(end - 1, start - 1, -1):
+      if i in removed:
+        continue
+      if quads[i][0] == 'GoTo' and land(quads[i][3]) == following:
+        removed.add(i)
+        continue
+      following = i
+
+    if not removed:
+      return False
+
+    self.removeQuads(removed, start)
+
+    if self.debug:
+      print(f'\t\t\t\t\t! Peephole removed {len(removed)} quads')
+    return True
+
+  # Remove dead code from the function that just ended: quads whose results nobody reads (including stores
+  # overwritten before being read) and blocks nothing jumps or flows into
+  def eliminateDeadCode(self, start):
+    isMain = self.funcDir.currentFunc == self.funcDir.globalFunc
+    ctes = dict()
     for cte in self.funcDir.cteTable.values():
-      f.write(f'{cte.value}\t{cte.vartype}\t{cte.vAddr}\n')
-    f.write('->| CTES END\n')
-    # Write ERAs
-    f.write('-> ERAS START\n')
+      ctes[cte.vAddr] = cte
+
+    # Branches on a constant always go the same way
+    removed = set()
+    for i in range(start, self.quadCount):
+      q = self.quads[i]
+      if q[0] == 'GoToF' and q[1] in ctes:
+        if ctes[q[1]].value:
+          removed.add(i)
+        else:
+          self.quads[i] = ['GoTo', None, None, q[3]]
+    self.removeQuads(removed, start)
+
+    if start == self.quadCount:
+      return
+
+    graph = FlowGraph(self.quads, start, self.quadCount, isMain, self.vDir)
+    liveness = Liveness(graph, lambda i: self.isPure(i, ctes))
+
+    removed = set()
+    for block in graph.getUnreachable():
+      removed.update(block.getQuads())
+
+    for block in graph.getReversePostorder():
+      for i in liveness.getDeadQuads(block):
+        removed.add(i)
+        if self.quads[i - 1][0] in ['MAT', 'MAT·']:
+          removed.add(i - 1)
+
+    if self.debug and removed:
+      print(f'\t\t\t\t\t! Removed {len(removed)} dead quads')
+    self.removeQuads(removed, start)
+
+  # Remove the blocks of the function that just ended that nothing jumps or flows into
+  # Returns whether any quad was removed
+  def eliminateUnreachable(self, start):
+    if start == self.quadCount:
+      return False
+
+    isMain = self.funcDir.currentFunc == self.funcDir.globalFunc
+    graph = FlowGraph(self.quads, start, self.quadCount, isMain, self.vDir)
+    removed = set()
+    for block in graph.getUnreachable():
+      removed.update(block.getQuads())
+
+    if not removed:
+      return False
+
+    if self.debug:
+      print(f'\t\t\t\t\t! Removed {len(removed)} unreachable quads')
+    self.removeQuads(removed, start)
+    return True
+
+  # Check if a quad does nothing besides writing its result
+  # NOTE: Int arithmetic has to fail on overflow, so it only is when it folds (without overflowing) between constants
+  def isPure(self, i, ctes):
+    q = self.quads[i]
+    if q[0] in ['/', '%']:
+      return self.quads[i - 1][0] != 'MAT' and q[2] in ctes and ctes[q[2]].value != 0
+    elif q[0] in int_ops and self.vDir.getType(q[3] & ~POINTER_BIT) == 'int':
+      if self.quads[i - 1][0] in ['MAT', 'MAT·'] or q[1] not in ctes or q[2] not in ctes:
+        return False
+      left, right = ctes[q[1]], ctes[q[2]]
+      return self.foldConstants(q[0], left.value, left.vartype, right.value, right.vartype) is not None
+    return q[0] in pure_ops
+
+  # Remove every function no call from main ever reaches, along with its ERA
+  # NOTE: Functions only called by other dead functions are dead too
+  def eliminateDeadFunctions(self):
+    funcs = [func for func in self.funcDir.directory.values() if func.name != 'main']
+    starts = {func.quadStart: func.name for func in funcs}
+    ranges = dict()
+    for n, func in enumerate(funcs):
+      ranges[func.name] = (func.quadStart, funcs[n + 1].quadStart if n + 1 < len(funcs) else self.mainStart)
+
+    called = set()
+    pending = [(self.mainStart, self.quadCount)]
+    while pending:
+      start, end = pending.pop()
+      for i in range(start, end):
+        q = self.quads[i]
+        if q[0] == 'GoSub' and starts[q[3]] not in called:
+          called.add(starts[q[3]])
+          pending.append(ranges[starts[q[3]]])
+
+    removed = set()
+    for func in funcs:
+      if func.name not in called:
+        removed.update(range(*ranges[func.name]))
+        del self.funcDir.directory[func.name]
+        if self.debug:
+          print(f'\t\t\t\t\t! Removed {func.name}(), nothing calls it')
+    self.removeQuads(removed, 1)
+
+  # Drop every constant no quad reads anymore
+  def eliminateUnusedCtes(self):
+    used = set()
+    for q in self.quads:
+      for pos in read_operands.get(q[0], ()):
+        used.add(q[pos])
+
+    for key, cte in list(self.funcDir.cteTable.items()):
+      if cte.vAddr not in used:
+        del self.funcDir.cteTable[key]
+
+  # Remove some quads from start onwards, moving every jump, call and function start past them along
+  # NOTE: Besides the jump to main, quads before start never go past it, since functions only call earlier ones
+  def removeQuads(self, removed, start):
+    if not removed:
+      return
+
+    end = self.quadCount
+    moved = []
+    count = start
+    for i in range(start, end + 1):
+      moved.append(count)
+      if i not in removed:
+        count += 1
+
+    quads = self.quads
+    kept = [i for i in range(start, end) if i not in removed]
+    for q in [quads[0]] + [quads[i] for i in kept]:
+      if q[0] in ['GoTo', 'GoToF', 'GoSub'] and q[3] is not None and q[3] >= start:
+        q[3] = moved[q[3] - start]
+
+    for func in self.funcDir.directory.values():
+      if func.quadStart is not None and func.quadStart >= start:
+        func.setQuadStart(moved[func.quadStart - start])
+    if self.mainStart is not None and self.mainStart >= start:
+      self.mainStart = moved[self.mainStart - start]
+
+    self.quads[start:] = [quads[i] for i in kept]
+    self.lines[start:] = [self.lines[i] for i in kept]
+    self.quadCount = len(self.quads)
+
+  ## FUNCTIONS (BUILDING)
+  # Get the built program (ranges, constants, ERAs and quads), ready to be run by HonkVM
+  def getProgram(self):
+    program = dict()
+    program['ranges'] = self.vDir.getRanges()
+    program['ctes'] = [(cte.value, cte.vartype, cte.vAddr) for cte in self.funcDir.cteTable.values()]
+
+    # Skip global since it has no ERA
+    program['eras'] = []
     for func in self.funcDir.directory.values():
-      # Skip global since it has no ERA
       if func.name == 'main':
         continue
       era = self.funcDir.getEra(func.name)
-      localCounts = '\t'.join([str(x) for x in era[0]])
-      tempCounts = '\t'.join([str(x) for x in era[1]])
-      f.write(f'{func.name}\t{localCounts}\t{tempCounts}\n')
-    f.write('->| ERAS END\n')
-    # Write quads
-    f.write('-> QUADS START\n')
-    for q in self.quads:
-      f.write(f'{q[0]}\t{q[1]}\t{q[2]}\t{q[3]}\n')
-    f.write('->| QUADS END\n')
+      program['eras'].append((func.name, list(era[0]), list(era[1])))
+
+    program['quads'] = [tuple(q) for q in self.quads]
+    program['lines'] = list(self.lines)
+    return program
+
+  # Build .o file
+  def build(self, filename):
+    if self.debug:
+      print(f'> Building {filename}...')
+
+    writeObj(self.getProgram(), filename)
 
     if self.debug:
       print(f'> Done!')
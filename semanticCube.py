@@ -1,5 +1,6 @@
 
 from collections import defaultdict
+from operator import add, sub, mul, truediv, mod, eq, ne, lt, le, gt, ge
 
 # Dual-operand type matching cube
 dual_cube = {
@@ -114,3 +115,41 @@ def getMonoResultType(vartype, operator):
     return mono_table[vartype][operator]
   except:
     return None
+
+# Logic operators keep the behavior of Python's `and`/`or`
+def logicAnd(left, right):
+  return left and right
+
+def logicOr(left, right):
+  return left or right
+
+# Dividing two ints truncates the result, same as storing a float in an int's memory
+def intDiv(left, right):
+  return int(left / right)
+
+# Native functions for every dual-operand operator
+dual_funcs = {
+  '+': add,
+  '-': sub,
+  '*': mul,
+  '/': truediv,
+  '%': mod,
+  '==': eq,
+  '!=': ne,
+  '<': lt,
+  '<=': le,
+  '>': gt,
+  '>=': ge,
+  '&': logicAnd,
+  '|': logicOr
+}
+
+# Returns native function of a dual-operand operation
+# NOTE: Both the compiler (folding constants) and the VM evaluate operations through here
+def getDuoFunction(left_type, right_type, operator):
+  if not getDuoResultType(left_type, right_type, operator) or operator not in dual_funcs:
+    return None
+
+  if operator == '/' and left_type == 'int' and right_type == 'int':
+    return intDiv
+  return dual_funcs[operator]
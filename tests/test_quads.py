@@ -0,0 +1,120 @@
+import os
+import sys
+
+# Run from anywhere, the compiler lives one folder up
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from compiler import Compiler
+from flowGraph import buildGraphs
+from virtualDirectory import VirtualDirectory
+
+# Checks on the quads the compiler emits, rather than on what programs print
+# NOTE: Addresses depend on how many variables, temps and constants came before, so checks go by
+# operations (and by how operands relate to each other) instead of by exact quads
+compiler = Compiler()
+
+## HELPERS
+# Compile a program with a main and, optionally, some variables and functions before it
+def compileMain(body, variables='', functions=''):
+  source = f'Program test;\n{f"var {variables}" if variables else ""}\n{functions}\nmain() {{\n{body}\n}}\n'
+  return compiler.compile(source)
+
+# Get the operations of a program's quads
+def getOps(program):
+  return [q[0] for q in program['quads']]
+
+# Get every temp address a program's quads write to
+def getTemps(program):
+  tempRanges = VirtualDirectory().tempRanges
+  return {q[3] for q in program['quads'] if isinstance(q[3], int) and tempRanges[0] <= q[3] < tempRanges[4]}
+
+## TEMPS
+# Temps get released once their value is used, so statements after it take the same ones again
+def test_temps_are_reused():
+  program = compileMain('\n'.join(f'v{n} = (a + b) * (c - d);' for n in range(5)) + '\nprint(v0 + v1 + v2 + v3 + v4);',
+                        'int a, b, c, d, v0, v1, v2, v3, v4;')
+
+  assert getOps(program).count('*') == 5
+  assert len(getTemps(program)) <= 3
+
+## OPTIMIZATIONS
+# Results assigned right away go straight into the variable, without going through a temp
+def test_results_are_stored_straight_into_variables():
+  program = compileMain('a = b + c;\nprint(a);', 'int a, b, c;')
+
+  assert getOps(program) == ['GoTo', '+', 'PRINT', 'END']
+  assert program['quads'][1][3] == program['quads'][2][3]
+  assert not getTemps(program)
+
+# The jump over an empty else lands on the very next quad, so it goes
+def test_goto_to_next_quad_is_dropped():
+  program = compileMain('if (a > b) then {\na = 1;\n} else {\n}\nprint(a);', 'int a, b;')
+
+  assert getOps(program) == ['GoTo', '>', 'GoToF', '=', 'PRINT', 'END']
+  for i, q in enumerate(program['quads'][1:], 1):     # The jump to main always stays, as quad 0
+    assert not (q[0] == 'GoTo' and q[3] == i + 1)
+
+# Leaving an if at the end of a loop jumps back to the loop's condition straight away
+def test_jumps_are_threaded():
+  program = compileMain('''
+    while (a < b) do {
+      if (a > c) then {
+        a = a + 1;
+      } else {
+        a = a + 2;
+      }
+    }
+    print(a);
+  ''', 'int a, b, c;')
+
+  quads = program['quads']
+  condition = getOps(program).index('<')
+  jumps = [q for q in quads[1:] if q[0] == 'GoTo']
+  assert len(jumps) == 2 and all(q[3] == condition for q in jumps)
+  for q in quads:
+    if q[0] in ['GoTo', 'GoToF']:
+      assert quads[q[3]][0] != 'GoTo'
+
+# Threading the jump out of a loop through a break leaves a GoTo behind nothing reaches
+def test_no_unreachable_quads_after_break():
+  program = compileMain('''
+    i = 0;
+    while (true) do {
+      i = i + 1;
+      if (i > 5) then {
+        break;
+      }
+    }
+    print(i);
+  ''', 'int i;')
+
+  assert getOps(program) == ['GoTo', '=', '+', '>', 'GoToF', 'PRINT', 'END']
+  for graph in buildGraphs(program).values():
+    assert not graph.getUnreachable()
+
+# Int arithmetic nobody reads still has to fail when it overflows, float arithmetic can go
+def test_dead_int_arithmetic_is_kept():
+  program = compileMain('''
+    x = 4611686018427387904;
+    y = x + x;
+    f = x * 1.5;
+    print("done");
+  ''', 'int x, y; float f;')
+
+  assert getOps(program).count('+') == 1
+  assert '*' not in getOps(program)
+
+# A store overwritten before anything reads it does nothing
+def test_overwritten_store_is_removed():
+  program = compileMain('a = b;\na = c;\nprint(a);', 'int a, b, c;')
+
+  assert program['quads'] == compileMain('a = c;\nprint(a);', 'int a, b, c;')['quads']
+
+# Dividing by a variable could divide by zero, so it stays even if nobody reads the result
+def test_division_by_variable_is_kept():
+  program = compileMain('a = b / c;\ne = b / 2;\nprint("done");', 'int a, b, c, e;')
+
+  divisions = [q for q in program['quads'] if q[0] == '/']
+  assert len(divisions) == 1
+  assert divisions[0][2] < VirtualDirectory().cteRanges[0]
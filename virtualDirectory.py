@@ -1,4 +1,8 @@
 
+# Bit that tags an address as a pointer (an operand holding the address to use)
+# NOTE: It must stay above every range below
+POINTER_BIT = 1 << 16
+
 class VirtualDirectory:
   def __init__(self):
     # Virtual address ranges
@@ -78,3 +82,28 @@ class VirtualDirectory:
   # Make more room for array variables
   def makeSpaceForArray(self, scope, vartype, value):
     self.setSpace(scope, vartype, value - 1)
+
+  # Tag an address as a pointer
+  def makePointer(self, vAddr):
+    return vAddr | POINTER_BIT
+
+  # Get the scope an address belongs to ('main', 'local', 'temp' or 'cte')
+  def getScope(self, vAddr):
+    if vAddr < self.globalRanges[4]:
+      return 'main'
+    elif vAddr < self.localRanges[4]:
+      return 'local'
+    elif vAddr < self.tempRanges[4]:
+      return 'temp'
+    return 'cte'
+
+  # Get the type of an address
+  def getType(self, vAddr):
+    ranges = {'main': self.globalRanges, 'local': self.localRanges, 'temp': self.tempRanges, 'cte': self.cteRanges}[self.getScope(vAddr)]
+    if vAddr < ranges[1]:
+      return 'int'
+    elif vAddr < ranges[2]:
+      return 'float'
+    elif vAddr < ranges[3]:
+      return 'char'
+    return 'bool'
@@ -0,0 +1,156 @@
+from array import array
+import sys
+import numpy as np
+
+# Typecodes of each type's buffer
+# (|| int || float || char || bool ||)
+typecodes = ('q', 'd', 'w' if sys.version_info >= (3, 13) else 'u', 'b')
+types = ('int', 'float', 'char', 'bool')
+
+# Coercion applied once when storing a value in each type's buffer
+coercions = (int, float, str, bool)
+
+# NumPy dtypes to view each type's buffer with (chars are viewed as their code points)
+dtypes = (np.int64, np.float64, np.dtype(f'u{array(typecodes[2]).itemsize}'), np.int8)
+
+# Range of values an int cell can hold
+INT_MIN, INT_MAX = -2 ** 63, 2 ** 63 - 1
+
+# Segments, in the same order as their ranges
+GLOBAL, LOCAL, TEMP, CTE = range(4)
+
+# NOTE: A "cell" is a (slot, offset) pair, where slot = segment * 4 + type.
+# Cells of locals and temps are relative to whichever frame is current, so
+# they can be resolved once at load time and reused by every call.
+class VirtualMemory:
+  def __init__(self, ranges):
+    # Virtual address ranges, same layout as VirtualDirectory's
+    self.ranges = ranges
+    self.globalRanges, self.localRanges, self.tempRanges, self.cteRanges = ranges
+
+    # Each segment is a list of 4 typed buffers: [int, float, char, bool]
+    self.Globals = self.allocate(self.getRangeSizes(self.globalRanges))
+    self.Ctes = self.allocate(self.getRangeSizes(self.cteRanges))
+
+    # Main's frame takes up the whole local and temp ranges
+    mainFrame = self.allocate(self.getRangeSizes(self.localRanges)) + self.allocate(self.getRangeSizes(self.tempRanges))
+
+    # Current bank of 16 buffers, indexed by slot, and the banks of every active call
+    self.bank = self.Globals + mainFrame + self.Ctes
+    self.sBanks = []
+
+  ## ALLOCATION
+  # Get the size of each type's section in a range
+  def getRangeSizes(self, memRange):
+    return [memRange[i + 1] - memRange[i] for i in range(4)]
+
+  # Allocate a zeroed buffer for each type
+  def allocate(self, sizes):
+    segment = []
+    for typecode, size in zip(typecodes, sizes):
+      buf = array(typecode)
+      segment.append(array(typecode, bytes(buf.itemsize * size)))
+    return segment
+
+  # Build the zeroed locals and temps of a function from its ERA, done once per function
+  def createFrameTemplate(self, era):
+    return self.allocate(era[0]) + self.allocate(era[1])
+
+  # Get a fresh frame for a call from its function's template
+  def createFrame(self, template):
+    return [buf[:] for buf in template]
+
+  # Make a frame the current one
+  def pushFrame(self, frame):
+    self.sBanks.append(self.bank)
+    self.bank = self.Globals + frame + self.Ctes
+
+  # Drop the current frame
+  def popFrame(self):
+    self.bank = self.sBanks.pop()
+
+  ## ADDRESSING
+  # Get index of type based on a memory range's address
+  def getTypeIndex(self, addr, memRange):
+    if addr < memRange[1]:
+      return 0
+    elif addr < memRange[2]:
+      return 1
+    elif addr < memRange[3]:
+      return 2
+    else:
+      return 3
+
+  # Get the segment an address falls in
+  def getSegment(self, addr):
+    if addr < self.globalRanges[0] or addr >= self.cteRanges[4]:
+      raise Exception(f'Accessing prohibited memory! -> ({addr})')
+
+    if addr < self.globalRanges[4]:
+      return GLOBAL
+    elif addr < self.localRanges[4]:
+      return LOCAL
+    elif addr < self.tempRanges[4]:
+      return TEMP
+    else:
+      return CTE
+
+  # Get the type of an address
+  def getType(self, addr):
+    memRange = self.ranges[self.getSegment(addr)]
+    return types[self.getTypeIndex(addr, memRange)]
+
+  # Get the type of a cell
+  def getCellType(self, cell):
+    return types[cell[0] & 3]
+
+  # Get the cell an address maps to
+  def locate(self, addr):
+    segment = self.getSegment(addr)
+    t = self.getTypeIndex(addr, self.ranges[segment])
+    return (segment * 4 + t, addr - self.ranges[segment][t])
+
+  # Get the address a cell maps back to
+  def getAddress(self, cell):
+    return self.ranges[cell[0] >> 2][cell[0] & 3] + cell[1]
+
+  ## ACCESS
+  # Get a value from a cell
+  def getValue(self, cell, matOffset=0):
+    try:
+      return self.bank[cell[0]][cell[1] + matOffset]
+    except IndexError:
+      raise Exception(f'Getting from out of bounds! -> ({self.getAddress(cell)}{f" + {matOffset}" if matOffset else ""})')
+
+  # Get a NumPy view over a contiguous block of cells, starting at a cell
+  # NOTE: The view shares memory with the buffer, so writing to it writes to memory
+  def getView(self, cell, size):
+    view = np.frombuffer(self.bank[cell[0]], dtype=dtypes[cell[0] & 3])[cell[1]:cell[1] + size]
+    if len(view) != size:
+      raise Exception(f'Getting from out of bounds! -> ({self.getAddress(cell)} - {self.getAddress(cell) + size - 1})')
+    return view
+
+  # Get a copy of a contiguous block of values
+  def getValues(self, cell, size):
+    return self.getView(cell, size).copy()
+
+  # Set a contiguous block of values at once, casting them into the cell's type
+  # NOTE: NumPy casts anything into an int block without complaining, so whatever isn't already
+  # made of int64s is checked first, overflowing the same way a single value does
+  def setValues(self, values, cell, size):
+    view = self.getView(cell, size)
+    if cell[0] & 3 == 0 and values.dtype != np.int64:
+      outside = np.flatnonzero(((values < INT_MIN) | (values >= INT_MAX + 1)).astype(bool))
+      if len(outside):
+        i = int(outside[0])
+        raise Exception(f'Integer overflow! {int(values[i])} -> ({self.getAddress(cell)}{f" + {i}" if i else ""})')
+    view[...] = values
+
+  # Set a value in a cell, coercing it into the cell's type
+  def setValue(self, value, cell, matOffset=0):
+    try:
+      self.bank[cell[0]][cell[1] + matOffset] = coercions[cell[0] & 3](value)
+    except IndexError:
+      raise Exception(f'Setting in invalid memory! -> ({self.getAddress(cell)}{f" + {matOffset}" if matOffset else ""})')
+    except OverflowError:
+      raise Exception(f'Integer overflow! {value} -> ({self.getAddress(cell)}{f" + {matOffset}" if matOffset else ""})')